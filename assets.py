@@ -0,0 +1,111 @@
+import pygame
+import json
+import os
+from settings import TILE_SIZE, ASSETS_DIR, ASSET_CACHE_DIR
+
+# Tiles de cor sólida empacotados no atlas junto com as imagens
+SOLID_TILES = {
+    "wall": (50, 50, 50),
+    "town": (210, 180, 140),
+    "lava": (255, 69, 0),
+    "swamp": (88, 60, 33),
+    "stairs_down": (70, 70, 70),
+    "stairs_up": (150, 150, 150),
+}
+
+# Tiles recortados de imagens: nome -> arquivo (usa o canto superior esquerdo, TILE_SIZE x TILE_SIZE)
+IMAGE_TILES = {
+    "background": "background_tile.png",
+    "shop": "shop.png",
+}
+
+CACHE_VERSION = 1
+
+class AssetManager:
+    """Carrega e converte cada imagem uma única vez e empacota os tiles pequenos num atlas.
+
+    As imagens já decodificadas são guardadas em ASSET_CACHE_DIR como pixels crus, então as
+    próximas execuções não precisam decodificar os PNGs. O cache é refeito sozinho quando
+    algum arquivo de origem muda."""
+
+    def __init__(self, assets_dir=ASSETS_DIR, cache_dir=ASSET_CACHE_DIR):
+        self.assets_dir = assets_dir
+        self.cache_dir = cache_dir
+        self.images = {}
+        self.atlas = None
+        self.atlas_rects = {} # nome do tile -> Rect dentro do atlas
+
+    def image(self, filename, alpha=False):
+        """Imagem de ASSETS_DIR já convertida para o formato da tela (compartilhada, não modificar)."""
+        key = (filename, alpha)
+        if key not in self.images:
+            fmt = "RGBA" if alpha else "RGB"
+            surface = self.load_cached(filename, [filename], fmt)
+            if surface is None:
+                surface = pygame.image.load(os.path.join(self.assets_dir, filename))
+                self.store_cached(filename, [filename], surface, fmt)
+            self.images[key] = surface.convert_alpha() if alpha else surface.convert()
+        return self.images[key]
+
+    def get_atlas(self):
+        if self.atlas is None:
+            self.build_atlas()
+        return self.atlas
+
+    def tile_rect(self, name):
+        self.get_atlas()
+        return self.atlas_rects[name]
+
+    def blit_tile(self, target, name, pos):
+        target.blit(self.get_atlas(), pos, self.tile_rect(name))
+
+    def build_atlas(self):
+        names = list(IMAGE_TILES) + list(SOLID_TILES)
+        for i, name in enumerate(names):
+            self.atlas_rects[name] = pygame.Rect(i * TILE_SIZE, 0, TILE_SIZE, TILE_SIZE)
+
+        sources = list(IMAGE_TILES.values())
+        atlas = self.load_cached("tile_atlas", sources, "RGBA")
+        if atlas is None:
+            atlas = pygame.Surface((len(names) * TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
+            for name, filename in IMAGE_TILES.items():
+                image = pygame.image.load(os.path.join(self.assets_dir, filename))
+                atlas.blit(image, self.atlas_rects[name], (0, 0, TILE_SIZE, TILE_SIZE))
+            for name, color in SOLID_TILES.items():
+                atlas.fill(color, self.atlas_rects[name])
+            self.store_cached("tile_atlas", sources, atlas, "RGBA")
+        self.atlas = atlas.convert_alpha()
+
+    # --- Cache em disco de pixels já decodificados ---
+    def source_signature(self, sources):
+        signature = [CACHE_VERSION, TILE_SIZE, sorted(SOLID_TILES.items())]
+        for filename in sources:
+            stat = os.stat(os.path.join(self.assets_dir, filename))
+            signature.append([filename, stat.st_mtime_ns, stat.st_size])
+        return json.loads(json.dumps(signature))
+
+    def cache_path(self, name):
+        return os.path.join(self.cache_dir, name + ".raw")
+
+    def load_cached(self, name, sources, fmt):
+        try:
+            with open(self.cache_path(name), "rb") as f:
+                header = json.loads(f.readline())
+                if header["source"] != self.source_signature(sources) or header["format"] != fmt:
+                    return None
+                return pygame.image.frombytes(f.read(), tuple(header["size"]), fmt)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store_cached(self, name, sources, surface, fmt):
+        header = {"source": self.source_signature(sources), "format": fmt, "size": surface.get_size()}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self.cache_path(name), "wb") as f:
+                f.write(json.dumps(header).encode() + b"\n")
+                f.write(pygame.image.tobytes(surface, fmt))
+        except OSError:
+            pass # Sem cache em disco o jogo só decodifica os PNGs de novo
+
+# Instância compartilhada por todo o jogo
+assets = AssetManager()
@@ -0,0 +1,47 @@
+import sqlite3
+import threading
+
+class SaveWriter:
+    """Grava saves numa thread de fundo para o loop do jogo não travar.
+
+    A thread principal tira um retrato do jogo (dicionários simples, sem referências aos objetos vivos)
+    e entrega com submit(); write(save_data) roda na thread de gravação (codificar, comprimir, gravar e
+    dar fsync no arquivo, ou gravar no WorldStore).
+    Se um retrato novo chegar antes de o anterior ser gravado, só o mais recente é gravado."""
+
+    def __init__(self, write):
+        self.write = write
+        self.condition = threading.Condition()
+        self.pending = None
+        self.busy = False
+        self.thread = None
+
+    def submit(self, save_data):
+        with self.condition:
+            self.pending = save_data
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.worker, name="save-writer", daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def flush(self):
+        """Espera até que todo retrato entregue tenha sido gravado."""
+        with self.condition:
+            while self.pending is not None or self.busy:
+                self.condition.wait()
+
+    def worker(self):
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                save_data, self.pending = self.pending, None
+                self.busy = True
+            try:
+                self.write(save_data)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                print(f"Não foi possível salvar o jogo ({e}).")
+            finally:
+                with self.condition:
+                    self.busy = False
+                    self.condition.notify_all()
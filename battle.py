@@ -1,8 +1,11 @@
 import pygame
+import game_input
 from settings import *
-from items import Item
+from items import item_catalog
 from spells import Spell
 from enemy import Boss
+from text_cache import get_font
+from scenes import Scene
 import random
 
 # --- CLASSE BUTTON APRIMORADA ---
@@ -41,13 +44,14 @@ class Button:
         if self.enabled and self.rect.collidepoint(pos):
             self.callback()
 
-class Battle:
+class Battle(Scene):
     def __init__(self, screen, player, enemy, background):
+        super().__init__()
         self.screen = screen
         self.player = player
         self.enemy = enemy
         self.background = background
-        self.font = pygame.font.SysFont("Arial", 20)
+        self.font = get_font("Arial", 20)
         self.running = True
         self.message = ""
         self.fled = False
@@ -101,8 +105,7 @@ class Battle:
 
     def attack(self):
         damage, player_crit = self.player.attack_power()
-        damage_type = self.player.equipped_weapon.damage_type if self.player.equipped_weapon else PHYSICAL
-        final_damage, weak, resist = self.enemy.take_damage(damage, damage_type)
+        final_damage, weak, resist = self.enemy.take_damage(damage, self.player.equipment.damage_type)
         
         self.message = f"Você causou {final_damage} de dano!"
         if player_crit: self.message = f"CRÍTICO! {self.message}"
@@ -136,8 +139,9 @@ class Battle:
             if action == "enrage":
                 self.message = self.enemy.enrage()
                 # O turno do chefe continua para que ele ataque imediatamente após entrar em fúria
+                self.draw(self.screen)
                 pygame.display.flip() # Atualiza a tela para mostrar a mensagem e a nova cor do chefe
-                pygame.time.wait(1000) # Pausa para o jogador ler
+                game_input.pause(1000) # Pausa para o jogador ler
                 action = self.enemy.decide_action() # Decide a próxima ação no mesmo turno
 
             if action == "smash_attack":
@@ -155,7 +159,7 @@ class Battle:
 
         # Lógica de ações padrão (para inimigos normais e ataque padrão do chefe)
         if action == "heal":
-            heal_amount = self.enemy.heal(20)
+            heal_amount = self.enemy.heal(ENEMY_HEAL_AMOUNT)
             self.message = f"O inimigo se curou em {heal_amount} HP!"
         elif action == "attack":
             enemy_attack, enemy_crit = self.enemy.attack_power
@@ -185,7 +189,7 @@ class Battle:
             if isinstance(self.enemy, Boss):
                 self.message += " CHEFE DERROTADO!"
                 self.player.gain_exp(1000)
-                item = Item("Lâmina do Rei Caído", "weapon", power=50, damage_type=PHYSICAL)
+                item = item_catalog["Lâmina do Rei Caído"]
             else:
                 self.message += " Inimigo derrotado!"
                 self.player.gain_exp(50)
@@ -193,21 +197,19 @@ class Battle:
                 if self.enemy.loot_table:
                     item = random.choice(self.enemy.loot_table)
                 else: # Fallback caso a loot_table esteja vazia
-                    item = Item("Poeira Mágica", "material")
+                    item = item_catalog["Poeira Mágica"]
             self.player.inventory.append(item)
             self.message += f" Você ganhou {gold_gain} de ouro e recebeu {item.name}!"
         self.running = False
 
     def use_potion(self):
-        for item in self.player.inventory:
-            if item.name == "Poção":
-                # CORREÇÃO: A poção agora cura 40% da vida máxima do jogador.
-                heal_amount = int(self.player.max_hp * 0.40)
-                self.player.hp = min(self.player.max_hp, self.player.hp + heal_amount)
-                self.player.inventory.remove(item)
-                self.message = f"Você usou uma Poção e recuperou {heal_amount} de HP!"
-                self.next_turn()
-                return
+        if self.player.inventory.take("Poção"):
+            # CORREÇÃO: A poção agora cura 40% da vida máxima do jogador.
+            heal_amount = int(self.player.max_hp * POTION_HEAL_FRACTION)
+            self.player.hp = min(self.player.max_hp, self.player.hp + heal_amount)
+            self.message = f"Você usou uma Poção e recuperou {heal_amount} de HP!"
+            self.next_turn()
+            return
         self.message = "Você não tem poções!"
 
     def choose_spell(self):
@@ -215,29 +217,7 @@ class Battle:
         if not spells:
             self.message = "Você não conhece nenhuma magia!"
             return
-        choosing = True
-        while choosing:
-            self.screen.fill((0, 0, 0))
-            self.screen.blit(self.background, (0, 0))
-            text = self.font.render("Escolha uma magia (ESC para voltar):", True, WHITE)
-            self.screen.blit(text, (50, 50))
-            for i, spell in enumerate(spells):
-                spell_text = f"{i+1}. {spell.name} (Custo: {spell.mana_cost} MP)"
-                color = WHITE if self.player.mana >= spell.mana_cost else (150, 150, 150)
-                text = self.font.render(spell_text, True, color)
-                self.screen.blit(text, (50, 100 + i*30))
-            pygame.display.flip()
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: pygame.quit(); exit()
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE: choosing = False
-                    elif pygame.K_1 <= event.key <= pygame.K_9:
-                        idx = event.key - pygame.K_1
-                        if idx < len(spells):
-                            spell = spells[idx]
-                            if self.player.mana >= spell.mana_cost:
-                                self.use_spell(spell)
-                                choosing = False
+        self.push(SpellMenuScene(self))
     
     def use_spell(self, spell):
         self.player.mana -= spell.mana_cost
@@ -258,62 +238,103 @@ class Battle:
             self.message = f"Você usou {spell.name}!"
         self.next_turn()
 
-    def run(self):
-        self.handle_status_effects(self.player)
-        while self.running and self.player.hp > 0 and self.enemy.hp > 0:
-            self.screen.fill((0, 0, 0))
-            self.screen.blit(self.background, (0, 0))
-            
-            # Desenha barras de vida e mana
-            self.draw_health_bar(50, 50, self.player.hp, self.player.max_hp, (0, 255, 0))
-            self.draw_mana_bar(50, 75, self.player.mana, self.player.max_mana, (0, 150, 255))
-            self.draw_health_bar(WIDTH - 250, 50, self.enemy.hp, self.enemy.max_hp, self.enemy.color)
-            
-            # Desenha textos de status
-            p_text = self.font.render(f"Você (Lv {self.player.level}) - HP: {self.player.hp}/{self.player.max_hp} | MP: {self.player.mana}/{self.player.max_mana}", True, WHITE)
-            e_text = self.font.render(f"Inimigo (Lv {self.enemy.level}) - HP: {self.enemy.hp}/{self.enemy.max_hp}", True, WHITE)
-            self.screen.blit(p_text, (50, 20))
-            self.screen.blit(e_text, (WIDTH - 250, 20))
-            
-            # --- MELHORIA: Indicador de Turno ---
-            turn_text_str = "Seu Turno" if self.turn == "player" else "Turno do Inimigo"
-            turn_color = (255, 255, 0) if self.turn == "player" else (255, 100, 100)
-            turn_text = self.font.render(turn_text_str, True, turn_color)
-            turn_rect = turn_text.get_rect(center=(WIDTH / 2, 35))
-            self.screen.blit(turn_text, turn_rect)
-            # ------------------------------------
+    def is_over(self):
+        return not self.running or self.player.hp <= 0 or self.enemy.hp <= 0
 
-            # Desenha a mensagem de batalha
-            message_surface = self.font.render(self.message, True, WHITE)
-            self.screen.blit(message_surface, (50, 300))
+    def on_enter(self):
+        self.handle_status_effects(self.player)
 
-            # --- MELHORIA: Atualiza e desenha os botões ---
-            mouse_pos = pygame.mouse.get_pos()
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            # A verificação de turno é feita dentro do método click do botão
             for button in self.buttons:
-                # Atualiza o estado do botão (hover)
-                button.hovered = button.rect.collidepoint(mouse_pos)
-                
-                # Lógica para habilitar/desabilitar botões
-                is_player_turn = self.turn == "player"
-                if button.text == "Magias":
-                    button.enabled = bool(self.player.spells) and is_player_turn
-                elif button.text == "Poção":
-                    has_potion = any(item.name == "Poção" for item in self.player.inventory)
-                    button.enabled = has_potion and is_player_turn
-                else:
-                    button.enabled = is_player_turn
-                
-                button.draw(self.screen, self.font)
-            # ---------------------------------------------
+                button.click(event.pos)
+            self.mark_dirty()
+        elif event.type == pygame.MOUSEMOTION:
+            self.mark_dirty() # Atualiza o destaque dos botões
 
+    def update(self):
+        if self.is_over() and self.manager.top is self:
+            # Mostra o resultado por um instante antes de voltar ao mapa
+            self.draw(self.screen)
             pygame.display.flip()
+            game_input.pause(1500)
+            self.close()
+
+    def draw(self, screen):
+        screen.fill((0, 0, 0))
+        screen.blit(self.background, (0, 0))
+        
+        # Desenha barras de vida e mana
+        self.draw_health_bar(50, 50, self.player.hp, self.player.max_hp, (0, 255, 0))
+        self.draw_mana_bar(50, 75, self.player.mana, self.player.max_mana, (0, 150, 255))
+        self.draw_health_bar(WIDTH - 250, 50, self.enemy.hp, self.enemy.max_hp, self.enemy.color)
+        
+        # Desenha textos de status
+        p_text = self.font.render(f"Você (Lv {self.player.level}) - HP: {self.player.hp}/{self.player.max_hp} | MP: {self.player.mana}/{self.player.max_mana}", True, WHITE)
+        e_text = self.font.render(f"Inimigo (Lv {self.enemy.level}) - HP: {self.enemy.hp}/{self.enemy.max_hp}", True, WHITE)
+        screen.blit(p_text, (50, 20))
+        screen.blit(e_text, (WIDTH - 250, 20))
+        
+        # --- MELHORIA: Indicador de Turno ---
+        turn_text_str = "Seu Turno" if self.turn == "player" else "Turno do Inimigo"
+        turn_color = (255, 255, 0) if self.turn == "player" else (255, 100, 100)
+        turn_text = self.font.render(turn_text_str, True, turn_color)
+        turn_rect = turn_text.get_rect(center=(WIDTH / 2, 35))
+        screen.blit(turn_text, turn_rect)
+        # ------------------------------------
+
+        # Desenha a mensagem de batalha
+        message_surface = self.font.render(self.message, True, WHITE)
+        screen.blit(message_surface, (50, 300))
+
+        # --- MELHORIA: Atualiza e desenha os botões ---
+        mouse_pos = pygame.mouse.get_pos()
+        for button in self.buttons:
+            # Atualiza o estado do botão (hover)
+            button.hovered = button.rect.collidepoint(mouse_pos)
+            
+            # Lógica para habilitar/desabilitar botões
+            is_player_turn = self.turn == "player"
+            if button.text == "Magias":
+                button.enabled = bool(self.player.spells) and is_player_turn
+            elif button.text == "Poção":
+                button.enabled = "Poção" in self.player.inventory and is_player_turn
+            else:
+                button.enabled = is_player_turn
             
-            # Processa eventos
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: pygame.quit(); exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    # A verificação de turno agora é feita dentro do método click do botão
-                    for button in self.buttons:
-                        button.click(mouse_pos)
-                        
-        pygame.time.wait(1500)
+            button.draw(screen, self.font)
+        # ---------------------------------------------
+
+class SpellMenuScene(Scene):
+    """Lista de magias aberta pelo botão "Magias" da batalha."""
+
+    def __init__(self, battle):
+        super().__init__()
+        self.battle = battle
+
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_ESCAPE:
+            self.close()
+        elif pygame.K_1 <= event.key <= pygame.K_9:
+            spells = self.battle.player.spells
+            idx = event.key - pygame.K_1
+            if idx < len(spells):
+                spell = spells[idx]
+                if self.battle.player.mana >= spell.mana_cost:
+                    self.close()
+                    self.battle.use_spell(spell)
+
+    def draw(self, screen):
+        battle = self.battle
+        screen.fill((0, 0, 0))
+        screen.blit(battle.background, (0, 0))
+        text = battle.font.render("Escolha uma magia (ESC para voltar):", True, WHITE)
+        screen.blit(text, (50, 50))
+        for i, spell in enumerate(battle.player.spells):
+            spell_text = f"{i+1}. {spell.name} (Custo: {spell.mana_cost} MP)"
+            color = WHITE if battle.player.mana >= spell.mana_cost else (150, 150, 150)
+            text = battle.font.render(spell_text, True, color)
+            screen.blit(text, (50, 100 + i*30))
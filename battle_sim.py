@@ -0,0 +1,151 @@
+import numpy as np
+from settings import (CLASS_STATS, LEVEL_UP_HP, LEVEL_UP_MANA, POTION_HEAL_FRACTION, ENEMY_ATTACK_RANGES, ENEMY_CRIT_CHANCE,
+                      ENEMY_HEAL_AMOUNT, ENEMY_HEAL_THRESHOLD, ENEMY_WEAKNESSES, ENEMY_RESISTANCES, BOSS_MAX_HP,
+                      BOSS_ATTACK_RANGE, BOSS_RESISTANCES, BOSS_ENRAGE_BONUS, BOSS_SMASH_RANGE, PHYSICAL)
+
+BOSS = "Boss"
+
+def damage_multiplier(damage_type, weaknesses, resistances):
+    """Mesmo cálculo de Enemy.take_damage."""
+    return weaknesses.get(damage_type, 1.0) * resistances.get(damage_type, 1.0)
+
+def simulate_battles(character_class, enemy_level, n=2000, player_level=1, potion_threshold=0.35,
+                     spell=None, defense=0, max_turns=200, rng=None):
+    """Simula n batalhas independentes de uma vez, com as regras de Battle, sem pygame.
+
+    enemy_level é o nível de um Enemy comum ou BOSS. O jogador segue uma política fixa: abaixo de
+    potion_threshold do HP máximo usa uma Poção (ou a magia de cura da classe, se não tiver poções);
+    senão lança `spell` (um Spell de dano, opcional) se tiver mana, e ataca nos demais turnos.
+    Cada turno é um passo vetorizado sobre as n batalhas ainda em andamento.
+
+    Retorna um dicionário com win_rate, turns_to_kill (média dos turnos nas vitórias), turns_p90,
+    potions_used (média por batalha) e timeout_rate (batalhas que passaram de max_turns)."""
+    rng = rng if rng is not None else np.random.default_rng()
+    stats = CLASS_STATS[character_class]
+    boss = enemy_level == BOSS
+
+    # --- Jogador (Player com o equipamento inicial da classe, depois de subir de nível) ---
+    p_max = stats["max_hp"] + LEVEL_UP_HP * (player_level - 1)
+    p_hp = np.full(n, p_max, dtype=np.int64)
+    p_mana = np.full(n, stats["max_mana"] + LEVEL_UP_MANA * (player_level - 1), dtype=np.int64)
+    potions = np.full(n, stats["potions"] + (player_level - 1), dtype=np.int64) # gain_exp dá uma Poção por nível
+    p_attack = stats["base_attack"] + stats["weapon_power"]
+    heal_cost, heal_power = stats["heal_spell"] or (None, 0)
+
+    # --- Inimigo ---
+    if boss:
+        e_max = BOSS_MAX_HP
+        e_min_atk = np.full(n, BOSS_ATTACK_RANGE[0], dtype=np.int64)
+        e_max_atk = np.full(n, BOSS_ATTACK_RANGE[1], dtype=np.int64)
+        weaknesses, resistances = {}, BOSS_RESISTANCES
+    else:
+        e_max = 30 + enemy_level * 15
+        low, high = ENEMY_ATTACK_RANGES[min(max(enemy_level, 1), max(ENEMY_ATTACK_RANGES))]
+        e_min_atk = np.full(n, low, dtype=np.int64)
+        e_max_atk = np.full(n, high, dtype=np.int64)
+        weaknesses, resistances = ENEMY_WEAKNESSES, ENEMY_RESISTANCES
+    e_hp = np.full(n, e_max, dtype=np.int64)
+    enraged = np.zeros(n, dtype=bool)
+    attack_mult = damage_multiplier(PHYSICAL, weaknesses, resistances)
+
+    # Efeito de status do `spell` no inimigo: turnos restantes (dano por turno e duração são fixos)
+    dot_turns = np.zeros(n, dtype=np.int64)
+    dot_damage = dot_duration = 0
+    if spell is not None:
+        spell_mult = damage_multiplier(spell.damage_type, weaknesses, resistances)
+        spell_damage = int(spell.power * spell_mult)
+        effect = spell.status_effect
+        dot_damage, dot_duration = (effect.damage_per_turn, effect.duration) if effect else (0, 0)
+
+    done = np.zeros(n, dtype=bool)
+    won = np.zeros(n, dtype=bool)
+    turns = np.zeros(n, dtype=np.int64)
+    potions_used = np.zeros(n, dtype=np.int64)
+
+    for turn in range(1, max_turns + 1):
+        active = ~done
+        if not active.any():
+            break
+
+        # --- Turno do jogador ---
+        low_hp = active & (p_hp < p_max * potion_threshold)
+        drink = low_hp & (potions > 0)
+        p_hp[drink] = np.minimum(p_max, p_hp[drink] + int(p_max * POTION_HEAL_FRACTION))
+        potions[drink] -= 1
+        potions_used[drink] += 1
+        acting = active & ~drink
+        if heal_cost is not None:
+            heal = acting & low_hp & (p_mana >= heal_cost)
+            p_mana[heal] -= heal_cost
+            p_hp[heal] = np.minimum(p_max, p_hp[heal] + heal_power)
+            acting &= ~heal
+        if spell is not None:
+            cast = acting & (p_mana >= spell.mana_cost)
+            p_mana[cast] -= spell.mana_cost
+            e_hp[cast] -= spell_damage
+            if dot_duration:
+                dot_turns[cast] = dot_duration # apply_status renova a duração
+            acting &= ~cast
+        crit = rng.random(n) < stats["crit_chance"]
+        hit = np.where(crit, p_attack * 2, p_attack)
+        e_hp[acting] -= (hit[acting] * attack_mult).astype(np.int64)
+
+        # Efeitos de status do inimigo contam no início do turno dele
+        ticking = active & (dot_turns > 0)
+        e_hp[ticking] -= dot_damage
+        dot_turns[ticking] -= 1
+        victory = active & (e_hp <= 0)
+        won |= victory
+        done |= victory
+        turns[victory] = turn
+        active &= ~victory
+
+        # --- Turno do inimigo ---
+        if boss:
+            # O chefe entra em fúria e ataca no mesmo turno, já com o bônus
+            enrage = active & ~enraged & (e_hp <= e_max * 0.5)
+            enraged |= enrage
+            e_min_atk[enrage] += BOSS_ENRAGE_BONUS
+            e_max_atk[enrage] += BOSS_ENRAGE_BONUS
+        swing = rng.integers(e_min_atk, e_max_atk + 1)
+        swing = np.where(rng.random(n) < ENEMY_CRIT_CHANCE, swing * 2, swing)
+        if boss:
+            smash = active & enraged & (rng.random(n) < 0.5)
+            swing = np.where(smash, rng.integers(BOSS_SMASH_RANGE[0], BOSS_SMASH_RANGE[1] + 1, n), swing)
+            attacking = active
+        else:
+            heal = active & (e_hp < e_max * ENEMY_HEAL_THRESHOLD) & (rng.random(n) < 0.5)
+            e_hp[heal] = np.minimum(e_max, e_hp[heal] + ENEMY_HEAL_AMOUNT)
+            attacking = active & ~heal
+        p_hp[attacking] -= np.maximum(1, swing[attacking] - defense)
+
+        defeat = active & (p_hp <= 0)
+        done |= defeat
+        turns[defeat] = turn
+
+    wins = won.sum()
+    return {
+        "win_rate": float(wins / n),
+        "turns_to_kill": float(turns[won].mean()) if wins else None,
+        "turns_p90": float(np.percentile(turns[won], 90)) if wins else None,
+        "potions_used": float(potions_used.mean()),
+        "timeout_rate": float((~done).sum() / n),
+    }
+
+def estimate_matrix(n=2000, enemy_levels=(1, 2, 3, 4), player_level=1, seed=None, **options):
+    """Estatísticas de simulate_battles para cada classe contra cada nível de inimigo e o chefe.
+    Retorna {(classe, nível ou BOSS): estatísticas}."""
+    rng = np.random.default_rng(seed)
+    return {(character_class, enemy): simulate_battles(character_class, enemy, n, player_level, rng=rng, **options)
+            for character_class in CLASS_STATS for enemy in list(enemy_levels) + [BOSS]}
+
+if __name__ == "__main__":
+    import time
+    started = time.perf_counter()
+    results = estimate_matrix(seed=0)
+    elapsed = time.perf_counter() - started
+    for (character_class, enemy), result in results.items():
+        turns = f"{result['turns_to_kill']:.1f}" if result["turns_to_kill"] is not None else "-"
+        print(f"{character_class:<10} vs {str(enemy):<5} vitória {result['win_rate']:6.1%}  turnos {turns:>5}  "
+              f"poções {result['potions_used']:.2f}")
+    print(f"{len(results)} combinações em {elapsed:.2f} s")
@@ -1,6 +1,7 @@
 import pygame
 from settings import TILE_SIZE, WHITE
-from items import Item
+from items import Item, Inventory
+from text_cache import get_font
 import random
 
 class TreasureChest:
@@ -12,7 +13,20 @@ class TreasureChest:
         self.is_opened = False
         self.color_closed = (139, 69, 19) # Marrom
         self.color_opened = (90, 45, 10)
-        self.font = pygame.font.SysFont("Arial", 16)
+        self.font = get_font("Arial", 16)
+
+    def to_dict(self):
+        return {"x": self.x, "y": self.y, "gold": self.gold, "is_opened": self.is_opened,
+                "items": Inventory(self.items).to_dict()}
+
+    @staticmethod
+    def from_dict(data):
+        items = []
+        for item_data in data.get("items", []):
+            items.extend([Item.from_dict(item_data)] * item_data.get("count", 1))
+        chest = TreasureChest(data["x"], data["y"], items, data.get("gold", 0))
+        chest.is_opened = data.get("is_opened", False)
+        return chest
 
     def draw(self, screen, camera_x, camera_y):
         color = self.color_opened if self.is_opened else self.color_closed
@@ -20,6 +34,9 @@ class TreasureChest:
         pygame.draw.rect(screen, color, rect)
         pygame.draw.rect(screen, (255, 223, 0), (rect.x + 12, rect.y + 8, 8, 5)) # Fechadura dourada
 
+    def get_draw_rect(self, camera_x, camera_y):
+        return pygame.Rect(self.x * TILE_SIZE - camera_x, self.y * TILE_SIZE - camera_y, TILE_SIZE, TILE_SIZE)
+
     def interact(self, player):
         if not self.is_opened:
             message = "Você encontrou "
@@ -1,6 +1,8 @@
 import pygame
+from scenes import Scene
 from settings import WHITE, BLACK
-from items import Item
+from items import item_catalog
+from text_cache import get_font
 
 class Recipe:
     def __init__(self, result_item, ingredients):
@@ -8,64 +10,154 @@ class Recipe:
         self.ingredients = ingredients # Ex: { "Pele de Lobo": 2, "Minério de Ferro": 1 }
 
 RECIPE_LIST = [
-    Recipe(Item("Armadura de Couro", "armor", slot="chest", defense=5, price=50), {"Pele de Lobo": 3}),
-    Recipe(Item("Elmo de Ferro", "armor", slot="helmet", defense=4, price=80), {"Minério de Ferro": 2}),
-    Recipe(Item("Poção Forte", "consumable", price=50), {"Erva Curativa": 2, "Poção": 1})
+    Recipe(item_catalog["Armadura de Couro"], {"Pele de Lobo": 3}),
+    Recipe(item_catalog["Elmo de Ferro"], {"Minério de Ferro": 2}),
+    Recipe(item_catalog["Poção Forte"], {"Erva Curativa": 2, "Poção": 1})
 ]
 
-class CraftingScreen:
-    def __init__(self, screen, player):
-        self.screen = screen
-        self.player = player
-        self.font = pygame.font.SysFont("Arial", 22)
-        self.running = True
-
-    def run(self):
-        while self.running:
-            self.draw()
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: pygame.quit(); exit()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_c: self.running = False
-                    elif pygame.K_1 <= event.key <= pygame.K_9:
-                        self.craft_item(event.key - pygame.K_1)
-
-    def has_ingredients(self, recipe):
-        for name, amount in recipe.ingredients.items():
-            count = sum(1 for item in self.player.inventory if item.name == name)
-            if count < amount:
-                return False
+class RecipeBook:
+    """Planejador de criação sobre um grafo de dependências das receitas, montado uma única vez.
+
+    Uma receita depende das receitas que produzem seus ingredientes; o grafo não pode ter ciclos.
+    As contagens vêm do mapa nome -> quantidade do Inventory (inventory.counts), então nenhuma
+    consulta percorre o inventário."""
+
+    def __init__(self, recipes):
+        self.recipes = list(recipes)
+        self.producers = {} # nome do resultado -> receita que o produz (a primeira da lista)
+        for recipe in self.recipes:
+            self.producers.setdefault(recipe.result_item.name, recipe)
+        self.order = self.topological_order() # quem produz um ingrediente vem antes de quem o usa
+        position = {recipe: i for i, recipe in enumerate(self.order)}
+        # Receitas intermediárias alcançáveis a partir de cada receita, de quem consome para quem produz
+        self.chains = {recipe: sorted(self.reachable(recipe), key=position.get, reverse=True) for recipe in self.recipes}
+
+    def ingredient_recipes(self, recipe):
+        return [self.producers[name] for name in recipe.ingredients if name in self.producers]
+
+    def topological_order(self):
+        order, state = [], {} # estado: 1 = visitando, 2 = pronto
+        for root in self.recipes:
+            if root in state:
+                continue
+            stack = [(root, iter(self.ingredient_recipes(root)))]
+            state[root] = 1
+            while stack:
+                recipe, pending = stack[-1]
+                child = next(pending, None)
+                if child is None:
+                    stack.pop()
+                    state[recipe] = 2
+                    order.append(recipe)
+                elif state.get(child) == 1:
+                    raise ValueError(f"Receitas em ciclo: {recipe.result_item.name} e {child.result_item.name}")
+                elif child not in state:
+                    state[child] = 1
+                    stack.append((child, iter(self.ingredient_recipes(child))))
+        return order
+
+    def reachable(self, recipe):
+        found, stack = set(), self.ingredient_recipes(recipe)
+        while stack:
+            child = stack.pop()
+            if child not in found:
+                found.add(child)
+                stack.extend(self.ingredient_recipes(child))
+        return found
+
+    def plan(self, recipe, amount, counts):
+        """Passos [(receita, vezes)] para criar amount unidades da receita, criando antes os ingredientes
+        que faltam; None se os materiais não bastarem. Os passos estão na ordem de execução."""
+        need = {name: n * amount for name, n in recipe.ingredients.items()}
+        steps = [(recipe, amount)]
+        for step in self.chains[recipe]:
+            name = step.result_item.name
+            have = counts.get(name, 0)
+            missing = need.get(name, 0) - have
+            if missing > 0:
+                steps.append((step, missing))
+                need[name] = have
+                for ingredient, n in step.ingredients.items():
+                    need[ingredient] = need.get(ingredient, 0) + n * missing
+        if any(n > counts.get(name, 0) for name, n in need.items()):
+            return None
+        steps.reverse()
+        return steps
+
+    def max_craftable(self, counts):
+        """Máximo criável de cada receita ({receita: quantidade}) numa única passada em ordem topológica:
+        um ingrediente rende o que há no inventário mais o máximo criável da receita que o produz."""
+        result = {}
+        for recipe in self.order:
+            best = min(self.available(name, counts, result) // n for name, n in recipe.ingredients.items())
+            if best and self.chains[recipe] and self.plan(recipe, best, counts) is None:
+                # Ingredientes intermediários disputam os mesmos materiais: a estimativa é só um limite
+                best = self.largest_plan(recipe, best, counts)
+            result[recipe] = best
+        return result
+
+    def available(self, name, counts, result):
+        producer = self.producers.get(name)
+        return counts.get(name, 0) + (result.get(producer, 0) if producer else 0)
+
+    def largest_plan(self, recipe, upper, counts):
+        low, high = 0, upper - 1 # high: maior quantidade que ainda pode ser viável
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.plan(recipe, middle, counts) is None:
+                high = middle - 1
+            else:
+                low = middle
+        return low
+
+    def craft(self, inventory, recipe, amount=1):
+        """Cria amount unidades numa única transação: ou todos os passos do plano são aplicados ou nada muda."""
+        steps = self.plan(recipe, amount, inventory.counts) if amount > 0 else None
+        if steps is None:
+            return False
+        for step, times in steps:
+            for name, n in step.ingredients.items():
+                inventory.take(name, n * times)
+            inventory.add(step.result_item, times)
         return True
 
-    def craft_item(self, index):
+recipe_book = RecipeBook(RECIPE_LIST)
+
+class CraftingScreen(Scene):
+    def __init__(self, player):
+        super().__init__()
+        self.player = player
+        self.font = get_font("Arial", 22)
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_c: self.close()
+            elif pygame.K_1 <= event.key <= pygame.K_9:
+                # Com Shift, cria o máximo possível de uma vez
+                self.craft_item(event.key - pygame.K_1, craft_all=bool(event.mod & pygame.KMOD_SHIFT))
+                self.mark_dirty()
+
+    def craft_item(self, index, craft_all=False):
         if index < len(RECIPE_LIST):
             recipe = RECIPE_LIST[index]
-            if self.has_ingredients(recipe):
-                # Remover ingredientes do inventário
-                for name, amount in recipe.ingredients.items():
-                    for _ in range(amount):
-                        item_to_remove = next(item for item in self.player.inventory if item.name == name)
-                        self.player.inventory.remove(item_to_remove)
-                # Adicionar item criado
-                self.player.inventory.append(recipe.result_item)
-
-    def draw(self):
-        self.screen.fill(BLACK)
-        title_text = self.font.render("Criação de Itens - Pressione [C] para fechar", True, WHITE)
-        self.screen.blit(title_text, (50, 50))
+            amount = recipe_book.max_craftable(self.player.inventory.counts)[recipe] if craft_all else 1
+            recipe_book.craft(self.player.inventory, recipe, amount)
+
+    def draw(self, screen):
+        screen.fill(BLACK)
+        title_text = self.font.render("Criação de Itens - Pressione [C] para fechar, Shift+número cria o máximo", True, WHITE)
+        screen.blit(title_text, (50, 50))
 
+        craftable = recipe_book.max_craftable(self.player.inventory.counts)
         y = 120
         for i, recipe in enumerate(RECIPE_LIST):
-            can_craft = self.has_ingredients(recipe)
-            color = WHITE if can_craft else (100, 100, 100)
+            color = WHITE if craftable[recipe] else (100, 100, 100)
             
             # Nome da receita
-            recipe_name = f"[{i+1}] {recipe.result_item.name}"
-            self.screen.blit(self.font.render(recipe_name, True, color), (70, y))
+            recipe_name = f"[{i+1}] {recipe.result_item.name} (x{craftable[recipe]})"
+            screen.blit(self.font.render(recipe_name, True, color), (70, y))
             
             # Ingredientes
             ing_text = "Ingredientes: " + ", ".join([f"{amount}x {name}" for name, amount in recipe.ingredients.items()])
-            self.screen.blit(self.font.render(ing_text, True, color), (300, y))
-            y += 40
-        
-        pygame.display.flip()
\ No newline at end of file
+            screen.blit(self.font.render(ing_text, True, color), (300, y))
+            y += 40
\ No newline at end of file
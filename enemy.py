@@ -1,45 +1,86 @@
 import pygame
-from settings import TILE_SIZE, PHYSICAL, FIRE, ICE, WHITE
-from status_effects import StatusEffect
-from items import Item
+from settings import (TILE_SIZE, WHITE, ENEMY_ATTACK_RANGES, ENEMY_CRIT_CHANCE, ENEMY_HEAL_AMOUNT, ENEMY_HEAL_THRESHOLD,
+                      ENEMY_FLEE_THRESHOLD, ENEMY_WEAKNESSES, ENEMY_RESISTANCES, BOSS_MAX_HP, BOSS_ATTACK_RANGE, BOSS_RESISTANCES,
+                      BOSS_ENRAGE_BONUS, BOSS_SMASH_RANGE, PHYSICAL)
+from status_effects import StatusEffects
+from items import item_catalog
+from text_cache import get_font
 import random
-from collections import deque
 
-class Enemy:
-    def __init__(self, x, y, level=1):
-        self.x = x
-        self.y = y
+class EnemyArchetype:
+    """Atributos fixos de um tipo de inimigo (um por nível de inimigo, mais o chefe), calculados uma
+    única vez e compartilhados por todos os inimigos desse tipo. Não devem ser modificados."""
+
+    __slots__ = ("level", "max_hp", "attack_range", "color", "size", "gold_drop", "weaknesses", "resistances",
+                 "loot_table", "move_cooldown", "flee_threshold", "font")
+
+    def __init__(self, level, max_hp, attack_range, color, size, gold_drop, weaknesses, resistances, loot_table, move_cooldown,
+                 flee_threshold=0):
         self.level = level
-        self.max_hp = 30 + level * 15
-        self.hp = self.max_hp
-        self.color = (0, 0, 255)
+        self.max_hp = max_hp
+        self.attack_range = attack_range
+        self.color = color
+        self.size = size
+        self.gold_drop = gold_drop
+        self.weaknesses = weaknesses
+        self.resistances = resistances
+        self.loot_table = loot_table
+        self.move_cooldown = move_cooldown
+        self.flee_threshold = flee_threshold # Foge do jogador abaixo desta fração de HP (0: nunca foge)
+        self.font = get_font("Arial", 14) # Rótulos de HP e nível
+
+ENEMY_ARCHETYPES = {} # nível -> EnemyArchetype, preenchido sob demanda (há um por nível alcançado)
+
+def enemy_archetype(level):
+    archetype = ENEMY_ARCHETYPES.get(level)
+    if archetype is None:
+        loot_table = [item_catalog["Pele de Lobo"]]
+        if level >= 2: loot_table.append(item_catalog["Minério de Ferro"])
+        if level >= 3: loot_table.append(item_catalog["Erva Curativa"])
+        archetype = ENEMY_ARCHETYPES[level] = EnemyArchetype(
+            level, 30 + level * 15, ENEMY_ATTACK_RANGES[min(max(level, 1), max(ENEMY_ATTACK_RANGES))], (0, 0, 255),
+            TILE_SIZE, 5 * level, ENEMY_WEAKNESSES, ENEMY_RESISTANCES, tuple(loot_table),
+            20, ENEMY_FLEE_THRESHOLD) # Inimigos se movem a cada 20 passos de simulação
+    return archetype
+
+def boss_archetype():
+    archetype = ENEMY_ARCHETYPES.get("boss")
+    if archetype is None:
+        archetype = ENEMY_ARCHETYPES["boss"] = EnemyArchetype(
+            10, BOSS_MAX_HP, BOSS_ATTACK_RANGE, (128, 0, 128), TILE_SIZE * 2, 500, {}, BOSS_RESISTANCES,
+            (item_catalog["Fragmento de Poder"],), 45) # Chefes se movem mais lentamente
+    return archetype
+
+class Enemy:
+    def __init__(self, x, y, level=1, archetype=None):
+        self.status_effects = StatusEffects()
         self.vision_range = 6 # Aumentado para o pathfinding ser mais útil
-        self.size = TILE_SIZE
-        self.gold_drop = 5 * level
         self.attack_type = PHYSICAL
-        self.weaknesses = {FIRE: 1.5}
-        self.resistances = {ICE: 0.5}
-        self.status_effects = []
-        
-        self.font = pygame.font.SysFont("Arial", 14)
+        self.reset(x, y, archetype or enemy_archetype(level))
 
-        # --- NOVOS ATRIBUTOS PARA MOVIMENTO ---
-        self.path = []
-        self.move_cooldown = 20 # Inimigos se movem a cada 20 frames
+    def reset(self, x, y, archetype):
+        """(Re)inicia o inimigo com os atributos do arquétipo; usado também pelo EnemyPool ao reaproveitá-lo."""
+        self.x = x
+        self.y = y
+        self.archetype = archetype
+        self.level = archetype.level
+        self.max_hp = archetype.max_hp
+        self.hp = self.max_hp
+        self.color = archetype.color
+        self.size = archetype.size
+        self.gold_drop = archetype.gold_drop
+        self.weaknesses = archetype.weaknesses
+        self.resistances = archetype.resistances
+        self.loot_table = archetype.loot_table
+        self.min_attack, self.max_attack = archetype.attack_range
+        self.font = archetype.font
+        self.move_cooldown = archetype.move_cooldown
+        self.flee_threshold = archetype.flee_threshold
         self.move_timer = 0
-        # ------------------------------------
-
-        self.loot_table = [Item("Pele de Lobo", "material")]
-        if level >= 2: self.loot_table.append(Item("Minério de Ferro", "material"))
-        if level >= 3: self.loot_table.append(Item("Erva Curativa", "material"))
-
-        if level == 1: self.min_attack, self.max_attack = 10, 30
-        elif level == 2: self.min_attack, self.max_attack = 30, 50
-        elif level == 3: self.min_attack, self.max_attack = 50, 70
-        else: self.min_attack, self.max_attack = 70, 90
+        self.status_effects.clear()
 
     def decide_action(self):
-        if self.hp < self.max_hp * 0.3 and random.random() < 0.5:
+        if self.hp < self.max_hp * ENEMY_HEAL_THRESHOLD and random.random() < 0.5:
             return "heal"
         return "attack"
 
@@ -50,32 +91,21 @@ class Enemy:
     @property
     def defense(self):
         base_def = 0
-        mod_def = sum(effect.stat_mods.get('defense', 0) for effect in self.status_effects)
-        return base_def + mod_def
+        return base_def + self.status_effects.modifier('defense')
 
     @property
     def attack(self):
         base_atk = random.randint(self.min_attack, self.max_attack)
-        mod_atk = sum(effect.stat_mods.get('attack', 0) for effect in self.status_effects)
-        return base_atk + mod_atk
+        return base_atk + self.status_effects.modifier('attack')
 
     def apply_status(self, effect):
-        for existing_effect in self.status_effects:
-            if existing_effect.name == effect.name:
-                existing_effect.duration = effect.duration
-                return
-        self.status_effects.append(StatusEffect(effect.name, effect.duration, effect.damage_per_turn, effect.stat_mods, effect.color))
+        self.status_effects.apply(effect)
 
     def update_status_effects(self):
-        messages = []
-        for effect in self.status_effects[:]:
-            if effect.damage_per_turn > 0:
-                self.hp -= effect.damage_per_turn
-                messages.append(f"Inimigo sofreu {effect.damage_per_turn} de dano de {effect.name}!")
-            effect.duration -= 1
-            if effect.duration <= 0:
-                self.status_effects.remove(effect)
-        return " ".join(messages)
+        damaging, _ = self.status_effects.tick()
+        for effect in damaging:
+            self.hp -= effect.damage_per_turn
+        return " ".join(f"Inimigo sofreu {effect.damage_per_turn} de dano de {effect.name}!" for effect in damaging)
 
     def take_damage(self, damage, damage_type):
         multiplier = self.weaknesses.get(damage_type, 1.0)
@@ -87,35 +117,20 @@ class Enemy:
     @property
     def attack_power(self):
         base_attack = self.attack
-        if random.random() < 0.10:
+        if random.random() < ENEMY_CRIT_CHANCE:
             return base_attack * 2, True
         return base_attack, False
 
     def find_path(self, start, goal, game_map):
         """
-        Encontra o caminho mais curto usando Breadth-First Search (BFS).
+        Encontra o caminho de menor custo usando A* (ver pathfinding.a_star).
         Retorna uma lista de tuplas (x, y) ou uma lista vazia se não houver caminho.
         """
-        queue = deque([(start, [start])])
-        visited = {start}
-        
-        while queue:
-            (current_x, current_y), path = queue.popleft()
-
-            if (current_x, current_y) == goal:
-                return path[1:] # Retorna o caminho sem o ponto inicial
-
-            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                neighbor = (current_x + dx, current_y + dy)
-                if game_map.is_walkable(neighbor[0], neighbor[1]) and neighbor not in visited:
-                    visited.add(neighbor)
-                    new_path = list(path)
-                    new_path.append(neighbor)
-                    queue.append((neighbor, new_path))
-        return [] # Nenhum caminho encontrado
-
-    def update(self, player, game_map):
-        self.move_timer += 1
+        return list(game_map.find_path(start, goal))
+
+    def update(self, player, game_map, ticks=1):
+        """Avança a IA em `ticks` passos de simulação (mais de um no nível de atualização fora da tela)."""
+        self.move_timer += ticks
         if self.move_timer < self.move_cooldown:
             return
         self.move_timer = 0
@@ -123,25 +138,27 @@ class Enemy:
         dx, dy = player.x - self.x, player.y - self.y
         dist = abs(dx) + abs(dy)
 
-        if dist <= self.vision_range and dist > 1:
-            # Recalcula o caminho se não houver um ou se o jogador se moveu muito
-            recalculate = not self.path
-            if self.path:
-                path_goal_x, path_goal_y = self.path[-1]
-                if abs(player.x - path_goal_x) > 2 or abs(player.y - path_goal_y) > 2:
-                    recalculate = True
-            
-            if recalculate:
-                self.path = self.find_path((self.x, self.y), (player.x, player.y), game_map)
-
-            # Move-se ao longo do caminho
-            if self.path:
-                next_x, next_y = self.path.pop(0)
-                if game_map.is_walkable(next_x, next_y):
-                    self.x = next_x
-                    self.y = next_y
-                else:
-                    self.path = [] # Limpa o caminho se estiver bloqueado
+        fleeing = self.hp < self.max_hp * self.flee_threshold
+        if dist <= self.vision_range and (dist > 1 or fleeing):
+            # Todos os inimigos compartilham o mesmo campo de fluxo até o jogador
+            flow_field = game_map.get_flow_field(player.x, player.y)
+            step = flow_field.flee_step(self.x, self.y) if fleeing else flow_field.next_step(self.x, self.y)
+            if step is None and not fleeing:
+                # Fora do alcance do campo: busca A* limitada (hierárquica em distâncias longas)
+                step = game_map.next_step((self.x, self.y), (player.x, player.y))
+            if step:
+                self.x, self.y = step
+
+    def to_dict(self):
+        return {"x": self.x, "y": self.y, "level": self.level, "hp": self.hp, "is_boss": isinstance(self, Boss)}
+
+    @staticmethod
+    def from_dict(data):
+        """Cria um Enemy (ou Boss), vindo do enemy_pool, a partir de um dicionário gerado por to_dict."""
+        if data.get("is_boss"): enemy = enemy_pool.acquire_boss(data["x"], data["y"])
+        else: enemy = enemy_pool.acquire(data["x"], data["y"], data["level"])
+        enemy.hp = data.get("hp", enemy.max_hp)
+        return enemy
 
     def draw(self, screen, camera_x, camera_y):
         rect = pygame.Rect(self.x * TILE_SIZE - camera_x, self.y * TILE_SIZE - camera_y, self.size, self.size)
@@ -151,20 +168,19 @@ class Enemy:
         screen.blit(hp_text, (rect.x, rect.y - 20))
         screen.blit(lvl_text, (rect.x, rect.y - 35))
 
+    def get_draw_rect(self, camera_x, camera_y):
+        """Área de tela ocupada pelo inimigo e seus rótulos de HP e nível."""
+        rect = pygame.Rect(self.x * TILE_SIZE - camera_x, self.y * TILE_SIZE - camera_y, self.size, self.size)
+        hp_w, hp_h = self.font.size(f"HP: {self.hp}/{self.max_hp}")
+        lvl_w, lvl_h = self.font.size(f"Lv: {self.level}")
+        return rect.unionall([pygame.Rect(rect.x, rect.y - 20, hp_w, hp_h), pygame.Rect(rect.x, rect.y - 35, lvl_w, lvl_h)])
+
 class Boss(Enemy):
     def __init__(self, x, y):
-        super().__init__(x, y, level=10)
-        self.max_hp = 800
-        self.hp = self.max_hp
-        self.min_attack, self.max_attack = 50, 80
-        self.color = (128, 0, 128)
-        self.size = TILE_SIZE * 2
-        self.gold_drop = 500
-        self.weaknesses = {}
-        self.resistances = {PHYSICAL: 0.7, FIRE: 0.7, ICE: 0.7}
-        self.loot_table = [Item("Fragmento de Poder", "material")]
-        self.move_cooldown = 45 # Chefes se movem mais lentamente
-        self.move_timer = 0
+        super().__init__(x, y, archetype=boss_archetype())
+
+    def reset(self, x, y, archetype):
+        super().reset(x, y, archetype)
         self.enraged = False
 
     def decide_action(self):
@@ -182,8 +198,8 @@ class Boss(Enemy):
         # Ações no estado normal (chefes não se curam)
         return "attack"
 
-    def update(self, player, game_map):
-        self.move_timer += 1
+    def update(self, player, game_map, ticks=1):
+        self.move_timer += ticks
         if self.move_timer < self.move_cooldown:
             return
         self.move_timer = 0
@@ -193,27 +209,52 @@ class Boss(Enemy):
 
         # O chefe se move se não estiver adjacente ao jogador
         if dist > 1:
-            step_x = 1 if dx > 0 else -1 if dx < 0 else 0
-            step_y = 1 if dy > 0 else -1 if dy < 0 else 0
-
-            # Lógica de movimento simples: prioriza o eixo com maior distância
-            if abs(dx) > abs(dy):
-                if game_map.is_walkable(self.x + step_x, self.y):
-                    self.x += step_x
-                elif game_map.is_walkable(self.x, self.y + step_y):
-                    self.y += step_y
-            else:
-                if game_map.is_walkable(self.x, self.y + step_y):
-                    self.y += step_y
-                elif game_map.is_walkable(self.x + step_x, self.y):
-                    self.x += step_x
+            # Longe do jogador usa o grafo hierárquico; perto, A* contorna paredes e, se o orçamento
+            # de busca acabar, segue o melhor caminho parcial
+            step = game_map.next_step((self.x, self.y), (player.x, player.y), allow_partial=True)
+            if step:
+                self.x, self.y = step
     
     def enrage(self):
         """Ativa o modo de fúria, aumentando o ataque e mudando a cor."""
         self.enraged = True
-        self.min_attack += 20
-        self.max_attack += 20
+        self.min_attack += BOSS_ENRAGE_BONUS
+        self.max_attack += BOSS_ENRAGE_BONUS
         self.color = (255, 0, 128) # Rosa choque para indicar fúria
         return "O Chefe ruge de fúria! Seu ataque aumentou!"
 
-    def smash_attack(self): return random.randint(100, 150), True
+    def smash_attack(self): return random.randint(*BOSS_SMASH_RANGE), True
+
+class EnemyPool:
+    """Reaproveita objetos Enemy e Boss entre níveis e batalhas em vez de criar novos a cada escada.
+
+    Inimigos derrotados ou de níveis que saíram da memória voltam ao pool com release e são
+    reiniciados (reset) pelo arquétipo do próximo uso."""
+
+    def __init__(self):
+        self.free = {Enemy: [], Boss: []}
+
+    def acquire(self, x, y, level=1):
+        free = self.free[Enemy]
+        if not free:
+            return Enemy(x, y, level)
+        enemy = free.pop()
+        enemy.reset(x, y, enemy_archetype(level))
+        return enemy
+
+    def acquire_boss(self, x, y):
+        free = self.free[Boss]
+        if not free:
+            return Boss(x, y)
+        boss = free.pop()
+        boss.reset(x, y, boss_archetype())
+        return boss
+
+    def release(self, enemy):
+        self.free[type(enemy)].append(enemy)
+
+    def release_all(self, enemies):
+        for enemy in enemies:
+            self.release(enemy)
+
+enemy_pool = EnemyPool()
@@ -0,0 +1,57 @@
+from settings import EQUIPMENT_SLOTS, PHYSICAL
+
+class Equipment:
+    """Itens equipados do jogador, um por slot, com a ficha de atributos que eles dão.
+
+    A ficha (attack, defense, damage_bonus e damage_type) só é recalculada quando o equipamento
+    muda; ler um atributo ou comparar um item com o equipado (attack_delta, defense_delta) não
+    percorre os slots nem cria objetos, então a tela de inventário pode fazer isso a cada frame."""
+
+    def __init__(self):
+        self.slots = dict.fromkeys(EQUIPMENT_SLOTS)
+        self.recompute()
+
+    def __getitem__(self, slot):
+        return self.slots[slot]
+
+    def __iter__(self):
+        return iter(self.slots.items())
+
+    def equip(self, item):
+        """Coloca o item no seu slot e retorna o que estava lá antes (ou None)."""
+        previous = self.slots[item.slot]
+        self.slots[item.slot] = item
+        self.recompute()
+        return previous
+
+    def unequip(self, slot):
+        previous = self.slots[slot]
+        self.slots[slot] = None
+        self.recompute()
+        return previous
+
+    def recompute(self):
+        self.attack = 0
+        self.defense = 0
+        self.damage_bonus = {} # tipo de dano -> poder somado dos itens desse tipo
+        for item in self.slots.values():
+            if item is None:
+                continue
+            self.attack += item.power
+            self.defense += item.defense
+            if item.damage_type:
+                self.damage_bonus[item.damage_type] = self.damage_bonus.get(item.damage_type, 0) + item.power
+        weapon = self.slots["weapon"]
+        self.damage_type = weapon.damage_type if weapon and weapon.damage_type else PHYSICAL
+
+    # --- Comparação ("e se eu equipar este item?") ---
+    def attack_delta(self, item):
+        current = self.slots[item.slot]
+        return item.power - (current.power if current else 0)
+
+    def defense_delta(self, item):
+        current = self.slots[item.slot]
+        return item.defense - (current.defense if current else 0)
+
+    def to_dict(self):
+        return {f"equipped_{slot}": item.to_dict() if item else None for slot, item in self.slots.items()}
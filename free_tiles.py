@@ -0,0 +1,108 @@
+import math
+import random
+import numpy as np
+
+class FreeTileIndex:
+    """Tiles livres (sem ocupante) agrupados por tipo de tile, para sortear pontos de surgimento.
+
+    Cada tipo tem uma lista densa de posições e cada posição sabe seu lugar na lista: remover troca a
+    posição pela última da lista, então inserir, remover e sortear um tile livre custam O(1).
+    Sortear tira o tile do índice, ou seja, pontos sorteados nunca se repetem."""
+
+    def __init__(self):
+        self.lists = {} # tipo -> [(x, y), ...]
+        self.where = {} # (x, y) -> (tipo, posição na lista)
+
+    @staticmethod
+    def from_tiles(tiles, origin=(0, 0), occupied=()):
+        """Índice de uma grade [y, x] de tiles cujo canto é origin, sem as posições ocupadas."""
+        index = FreeTileIndex()
+        x0, y0 = origin
+        for tile_type in np.unique(tiles).tolist():
+            ys, xs = np.nonzero(tiles == tile_type)
+            positions = list(zip((xs + x0).tolist(), (ys + y0).tolist()))
+            index.lists[tile_type] = positions
+            index.where.update((pos, (tile_type, i)) for i, pos in enumerate(positions))
+        for pos in occupied:
+            index.remove(pos)
+        return index
+
+    def __contains__(self, pos):
+        return pos in self.where
+
+    def count(self, tile_type):
+        return len(self.lists.get(tile_type, ()))
+
+    def add(self, pos, tile_type):
+        if pos in self.where:
+            return
+        positions = self.lists.setdefault(tile_type, [])
+        self.where[pos] = (tile_type, len(positions))
+        positions.append(pos)
+
+    def remove(self, pos):
+        """Tira a posição do índice; retorna o tipo do tile, ou None se ela não estava livre."""
+        entry = self.where.pop(pos, None)
+        if entry is None:
+            return None
+        tile_type, i = entry
+        positions = self.lists[tile_type]
+        last = positions.pop()
+        if last != pos:
+            positions[i] = last
+            self.where[last] = (tile_type, i)
+        return tile_type
+
+    def pop_random(self, tile_type, rng=random):
+        positions = self.lists.get(tile_type)
+        if not positions:
+            return None
+        pos = positions[rng.randrange(len(positions))]
+        self.remove(pos)
+        return pos
+
+    def sample(self, tile_type, count, rng=random, min_distance=0):
+        """Sorteia sem reposição até count tiles livres do tipo, tirando-os do índice.
+
+        Com min_distance > 0 faz amostragem de disco de Poisson: nenhum par de pontos fica a menos de
+        min_distance tiles. Os pontos aceitos ficam numa grade de células de lado min_distance/√2 (no
+        máximo um por célula), então cada candidato é testado contra poucos vizinhos; como cada tile
+        livre é candidato no máximo uma vez, o custo é limitado pelo número de tiles livres mesmo
+        quando não cabem count pontos (aí são retornados menos)."""
+        if min_distance <= 0:
+            points = []
+            while len(points) < count:
+                pos = self.pop_random(tile_type, rng)
+                if pos is None:
+                    break
+                points.append(pos)
+            return points
+
+        cell = min_distance / math.sqrt(2)
+        reach = math.ceil(min_distance / cell)
+        min_distance_sq = min_distance * min_distance
+        grid = {} # célula -> ponto aceito
+        points, rejected = [], []
+        while len(points) < count:
+            pos = self.pop_random(tile_type, rng)
+            if pos is None:
+                break
+            x, y = pos
+            cx, cy = int(x // cell), int(y // cell)
+            too_close = False
+            for ny in range(cy - reach, cy + reach + 1):
+                for nx in range(cx - reach, cx + reach + 1):
+                    other = grid.get((nx, ny))
+                    if other is not None and (other[0] - x) ** 2 + (other[1] - y) ** 2 < min_distance_sq:
+                        too_close = True
+                        break
+                if too_close:
+                    break
+            if too_close:
+                rejected.append(pos)
+            else:
+                grid[(cx, cy)] = pos
+                points.append(pos)
+        for pos in rejected:
+            self.add(pos, tile_type) # Candidatos recusados continuam livres
+        return points
@@ -0,0 +1,41 @@
+import pygame
+
+class PygameInput:
+    """Entrada padrão: eventos e teclas da janela do pygame e pausas em tempo real."""
+
+    def get_events(self):
+        return pygame.event.get()
+
+    def wait_events(self, timeout):
+        """Dorme até chegar um evento (ou passar `timeout` ms) e devolve os eventos pendentes."""
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def get_pressed(self):
+        return pygame.key.get_pressed()
+
+    def pause(self, milliseconds):
+        pygame.time.wait(milliseconds)
+
+# Fonte de entrada usada por todas as telas; o runner headless troca por um roteiro (ver set_source)
+_source = PygameInput()
+
+def set_source(source):
+    """Troca a fonte de entrada. Ela precisa ter get_events(), wait_events(timeout), get_pressed() e pause(ms)."""
+    global _source
+    _source = source
+
+def get_events():
+    return _source.get_events()
+
+def wait_events(timeout):
+    return _source.wait_events(timeout)
+
+def get_pressed():
+    return _source.get_pressed()
+
+def pause(milliseconds):
+    """Pausa para o jogador ler algo na tela (as simulações headless não esperam)."""
+    _source.pause(milliseconds)
@@ -0,0 +1,112 @@
+"""Runner headless: executa a mesma lógica do jogo sem janela e sem esperar o relógio real.
+
+Uso:
+    python headless.py --ticks 20000 --class Guerreiro --seed 1 --script roteiro.json
+
+O vídeo usa o driver "dummy" do SDL, as pausas das telas (ex.: fim de batalha) são desligadas e
+cada frame simula um número fixo de passos, então a simulação anda o mais rápido que a CPU permitir.
+Ao final é impresso um resumo com os passos por segundo (ticks/s).
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import random
+import sys
+import pygame
+import game_input
+
+# Centro do botão "Atacar" da tela de batalha (ver Battle.buttons)
+ATTACK_BUTTON_POS = (110, 420)
+
+class HeldKeys:
+    """Estado de teclado no formato de pygame.key.get_pressed(): indexado pela constante da tecla."""
+
+    def __init__(self, keys):
+        self.keys = keys
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+class ScriptedInput:
+    """Fonte de entrada que segue um roteiro em vez do teclado e do mouse.
+
+    O roteiro é uma lista de ações, cada uma com o passo de simulação ("tick") em que acontece:
+        {"tick": 0, "hold": "K_RIGHT", "ticks": 90}  segura uma tecla por alguns passos
+        {"tick": 120, "press": "K_i"}                aperta e solta uma tecla
+        {"tick": 130, "click": [110, 420]}           clique do mouse na posição dada
+        {"tick": 500, "quit": true}                  fecha o jogo
+    Ações vencidas são entregues uma por leitura de eventos, na ordem, inclusive dentro de telas
+    modais: um "press" de K_i abre o inventário e o próximo "press" de K_i já é lido por ele.
+    Com auto_battle, quando o roteiro não tem nada a entregar, um clique em "Atacar" é enviado para
+    que as batalhas terminem sozinhas (fora da batalha o clique não faz nada)."""
+
+    def __init__(self, script, sim_clock, auto_battle=True):
+        self.pending = sorted((action for action in script if "hold" not in action), key=lambda a: a["tick"])
+        self.holds = [action for action in script if "hold" in action]
+        self.sim_clock = sim_clock
+        self.auto_battle = auto_battle
+
+    def get_events(self):
+        events = []
+        if self.pending and self.pending[0]["tick"] <= self.sim_clock.ticks:
+            action = self.pending.pop(0)
+            if "press" in action:
+                key = getattr(pygame, action["press"])
+                events.append(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode=""))
+                events.append(pygame.event.Event(pygame.KEYUP, key=key, mod=0))
+            elif "click" in action:
+                events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=tuple(action["click"]), button=1))
+            elif action.get("quit"):
+                events.append(pygame.event.Event(pygame.QUIT))
+        pygame.event.pump() # Mantém a fila do SDL vazia
+        if not events and self.auto_battle:
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=ATTACK_BUTTON_POS, button=1))
+        return events
+
+    def wait_events(self, timeout):
+        return self.get_events() # Nunca espera: o roteiro ou o clique automático sempre respondem
+
+    def get_pressed(self):
+        tick = self.sim_clock.ticks
+        return HeldKeys({getattr(pygame, action["hold"]) for action in self.holds
+                         if action["tick"] <= tick < action["tick"] + action.get("ticks", 1)})
+
+    def pause(self, milliseconds):
+        pass
+
+def run(max_ticks, character_class="Guerreiro", script=(), seed=None, ticks_per_frame=30, auto_battle=True):
+    """Roda uma simulação headless e retorna as estatísticas de main.run_game (com "ticks_per_second")."""
+    if seed is not None:
+        random.seed(seed)
+    import main # Abre a tela (no driver dummy) ao ser importado
+    game_input.set_source(ScriptedInput(list(script), main.sim_clock, auto_battle))
+    stats = main.run_game(game_mode="new", character_class=character_class, max_ticks=max_ticks,
+                          ticks_per_frame=ticks_per_frame, save_on_quit=False, autosave=False)
+    stats["ticks_per_second"] = stats["ticks"] / stats["seconds"] if stats["seconds"] > 0 else float("inf")
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa o jogo sem janela, o mais rápido possível.")
+    parser.add_argument("--ticks", type=int, default=10000, help="passos de simulação a executar")
+    parser.add_argument("--class", dest="character_class", default="Guerreiro", choices=["Guerreiro", "Mago", "Arqueiro"])
+    parser.add_argument("--seed", type=int, default=None, help="semente para uma execução reproduzível")
+    parser.add_argument("--script", default=None, help="arquivo JSON com a lista de ações (ver ScriptedInput)")
+    parser.add_argument("--ticks-per-frame", type=int, default=30, help="passos simulados por frame renderizado")
+    parser.add_argument("--no-auto-battle", action="store_true", help="não clicar em Atacar automaticamente")
+    args = parser.parse_args()
+
+    script = []
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+    stats = run(args.ticks, args.character_class, script, args.seed, args.ticks_per_frame, not args.no_auto_battle)
+    print(f"{stats['ticks']} passos em {stats['seconds']:.2f} s ({stats['ticks_per_second']:.0f} ticks/s), "
+          f"{stats['frames']} frames, nível {stats['level']}, jogador {'morto' if stats['player_dead'] else 'vivo'}")
+    pygame.quit()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
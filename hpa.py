@@ -0,0 +1,222 @@
+import heapq
+from collections import OrderedDict
+from settings import NEIGHBOR_OFFSETS, HPA_CLUSTER_SIZE, HPA_LONG_ENTRANCE, HPA_MAX_EXPANSIONS, HPA_MAX_CLUSTERS
+from pathfinding import INF, tile_cost, a_star
+
+class HierarchicalPathfinder:
+    """Pathfinding hierárquico (HPA*) sobre um GameMap.
+
+    O mapa é dividido em clusters de HPA_CLUSTER_SIZE x HPA_CLUSTER_SIZE tiles. Em cada fronteira entre
+    dois clusters vizinhos, cada trecho contínuo de tiles caminháveis vira uma entrada (ou duas, nas
+    pontas, se o trecho for longo). O grafo abstrato liga as entradas de um mesmo cluster pelo custo
+    do menor caminho interno e cada entrada ao seu par do outro lado da fronteira.
+
+    Uma busca longa percorre só esse grafo (algumas centenas de nós, independente do tamanho do mapa)
+    e depois refina os trechos com A* limitado a um cluster. Os clusters são montados sob demanda, então
+    também funcionam no mundo em streaming, e uma mudança de tile refaz apenas o cluster afetado e os
+    vizinhos que compartilham fronteira com ele."""
+
+    def __init__(self, game_map, cluster_size=HPA_CLUSTER_SIZE):
+        self.game_map = game_map
+        self.cluster_size = cluster_size
+        # Fronteira ("v", cx, cy) fica à direita do cluster (cx, cy); ("h", cx, cy) fica abaixo dele.
+        # Cada uma guarda pares (tile de cá, tile de lá, custo de ida, custo de volta)
+        self.borders = {}
+        # (cx, cy) -> {"links": {entrada: [(par, custo)]}, "edges": {entrada: [(entrada, custo)]}} (LRU)
+        self.clusters = OrderedDict()
+
+    # --- Geometria dos clusters ---
+    def cluster_of(self, x, y):
+        return (x // self.cluster_size, y // self.cluster_size)
+
+    def cluster_bounds(self, cx, cy):
+        """Retângulo (x0, y0, x1, y1) do cluster, com x1 e y1 exclusivos, recortado ao mapa."""
+        size = self.cluster_size
+        x0, y0 = cx * size, cy * size
+        return (x0, y0, min(x0 + size, self.game_map.cols), min(y0 + size, self.game_map.rows))
+
+    def cluster_costs(self, cx, cy):
+        x0, y0, x1, y1 = self.cluster_bounds(cx, cy)
+        region = self.game_map.get_region(x0, y0, x1 - x0, y1 - y0).tolist()
+        return [[tile_cost(t) for t in row] for row in region]
+
+    # --- Entradas nas fronteiras ---
+    def get_border(self, key):
+        pairs = self.borders.get(key)
+        if pairs is None:
+            pairs = self.borders[key] = self.build_border(*key)
+        return pairs
+
+    def build_border(self, orientation, cx, cy):
+        x0, y0, x1, y1 = self.cluster_bounds(cx, cy)
+        if orientation == "v":
+            if x1 >= self.game_map.cols:
+                return []
+            # Coluna x1 - 1 (deste cluster) e coluna x1 (do vizinho da direita)
+            strip = self.game_map.get_region(x1 - 1, y0, 2, y1 - y0).tolist()
+            sides = [(tile_cost(a), tile_cost(b)) for a, b in strip]
+            tiles = lambda i: ((x1 - 1, y0 + i), (x1, y0 + i))
+        else:
+            if y1 >= self.game_map.rows:
+                return []
+            strip = self.game_map.get_region(x0, y1 - 1, x1 - x0, 2).tolist()
+            sides = [(tile_cost(a), tile_cost(b)) for a, b in zip(*strip)]
+            tiles = lambda i: ((x0 + i, y1 - 1), (x0 + i, y1))
+
+        pairs = []
+        run_start = None
+        for i in range(len(sides) + 1):
+            open_pair = i < len(sides) and None not in sides[i]
+            if open_pair and run_start is None:
+                run_start = i
+            elif not open_pair and run_start is not None:
+                end = i - 1
+                if end - run_start + 1 >= HPA_LONG_ENTRANCE:
+                    chosen = (run_start, end)
+                else:
+                    chosen = ((run_start + end) // 2,)
+                for j in chosen:
+                    here, there = tiles(j)
+                    pairs.append((here, there, sides[j][1], sides[j][0]))
+                run_start = None
+        return pairs
+
+    # --- Grafo abstrato ---
+    def get_cluster(self, cx, cy):
+        record = self.clusters.get((cx, cy))
+        if record is None:
+            record = self.clusters[(cx, cy)] = self.build_cluster(cx, cy)
+            if len(self.clusters) > HPA_MAX_CLUSTERS:
+                self.clusters.popitem(last=False)
+                if len(self.borders) > 4 * HPA_MAX_CLUSTERS:
+                    self.borders.clear() # São baratas de refazer; evita crescer sem limite no streaming
+        else:
+            self.clusters.move_to_end((cx, cy))
+        return record
+
+    def build_cluster(self, cx, cy):
+        links = {}
+        for here, there, cost_out, cost_in in self.get_border(("v", cx, cy)) + self.get_border(("h", cx, cy)):
+            links.setdefault(here, []).append((there, cost_out))
+        for there, here, cost_in, cost_out in self.get_border(("v", cx - 1, cy)) + self.get_border(("h", cx, cy - 1)):
+            links.setdefault(here, []).append((there, cost_out))
+
+        # Custos internos entre cada par de entradas, com Dijkstra restrito ao cluster
+        x0, y0 = cx * self.cluster_size, cy * self.cluster_size
+        costs = self.cluster_costs(cx, cy)
+        edges = {}
+        for node in links:
+            dist = cluster_dijkstra(costs, node[0] - x0, node[1] - y0)
+            edges[node] = [(other, dist[other[1] - y0][other[0] - x0]) for other in links
+                           if other != node and dist[other[1] - y0][other[0] - x0] != INF]
+        return {"links": links, "edges": edges}
+
+    def invalidate_tile(self, x, y):
+        """Descarta o cluster que contém (x, y), suas fronteiras e os vizinhos que dependem delas."""
+        cx, cy = self.cluster_of(x, y)
+        for key in (("v", cx, cy), ("h", cx, cy), ("v", cx - 1, cy), ("h", cx, cy - 1)):
+            self.borders.pop(key, None)
+        for key in ((cx, cy), (cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+            self.clusters.pop(key, None)
+
+    # --- Consultas ---
+    def find_path(self, start, goal, first_segment_only=False):
+        """Caminho de start até goal (sem o ponto inicial) pelo grafo abstrato, ou [] se não houver.
+        Com first_segment_only, refina só o primeiro trecho: basta para dar o próximo passo."""
+        if start == goal:
+            return []
+        abstract = self.abstract_path(start, goal)
+        if not abstract:
+            return []
+        path = []
+        for a, b in zip(abstract, abstract[1:]):
+            if abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 and self.cluster_of(*a) != self.cluster_of(*b):
+                segment = [b] # Travessia de fronteira entre dois pares de entrada
+            else:
+                bounds = self.cluster_bounds(*self.cluster_of(*a))
+                segment = a_star(self.game_map, a, b, self.cluster_size ** 2, bounds=bounds)
+                if not segment and a != b:
+                    return path # O mapa mudou no meio do caminho; o que já foi refinado ainda vale
+            path.extend(segment)
+            if first_segment_only and path:
+                break
+        return path
+
+    def abstract_path(self, start, goal):
+        """Sequência [start, entradas..., goal] encontrada por A* no grafo abstrato."""
+        start_cluster, goal_cluster = self.cluster_of(*start), self.cluster_of(*goal)
+        if start_cluster == goal_cluster:
+            bounds = self.cluster_bounds(*start_cluster)
+            if a_star(self.game_map, start, goal, self.cluster_size ** 2, bounds=bounds):
+                return [start, goal]
+
+        # Liga início e alvo temporariamente às entradas dos seus clusters
+        sx0, sy0 = start_cluster[0] * self.cluster_size, start_cluster[1] * self.cluster_size
+        start_dist = cluster_dijkstra(self.cluster_costs(*start_cluster), start[0] - sx0, start[1] - sy0)
+        gx0, gy0 = goal_cluster[0] * self.cluster_size, goal_cluster[1] * self.cluster_size
+        goal_dist = cluster_dijkstra(self.cluster_costs(*goal_cluster), goal[0] - gx0, goal[1] - gy0, reverse=True)
+        goal_links = {node: goal_dist[node[1] - gy0][node[0] - gx0] for node in self.get_cluster(*goal_cluster)["links"]}
+
+        gx, gy = goal
+        heuristic = lambda node: abs(gx - node[0]) + abs(gy - node[1])
+        start_record = self.get_cluster(*start_cluster)
+        start_edges = [(node, start_dist[node[1] - sy0][node[0] - sx0]) for node in start_record["links"]
+                       if node != start and start_dist[node[1] - sy0][node[0] - sx0] != INF]
+        start_edges += start_record["links"].get(start, [])
+        g_costs, parents = {start: 0}, {start: None}
+        # Empates no custo total favorecem o nó mais perto do alvo
+        open_heap = [(heuristic(start), heuristic(start), start)]
+
+        closed = set()
+        expansions = 0
+        while open_heap and expansions < HPA_MAX_EXPANSIONS:
+            _, _, node = heapq.heappop(open_heap)
+            if node in closed:
+                continue
+            if node == goal:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parents[node]
+                path.reverse()
+                return path
+            closed.add(node)
+            expansions += 1
+            g = g_costs[node]
+
+            if node == start:
+                neighbors = start_edges
+            else:
+                record = self.get_cluster(*self.cluster_of(*node))
+                neighbors = record["edges"].get(node, []) + record["links"].get(node, [])
+            if goal_links.get(node, INF) != INF:
+                neighbors = neighbors + [(goal, goal_links[node])]
+            for neighbor, cost in neighbors:
+                new_g = g + cost
+                if neighbor not in closed and new_g < g_costs.get(neighbor, INF):
+                    g_costs[neighbor], parents[neighbor] = new_g, node
+                    h = heuristic(neighbor)
+                    heapq.heappush(open_heap, (new_g + h, h, neighbor))
+        return []
+
+def cluster_dijkstra(costs, lx, ly, reverse=False):
+    """Distâncias a partir do tile local (lx, ly) dentro de uma grade de custos de um cluster.
+    Com reverse, calcula o custo de ir de cada tile até (lx, ly) (o custo é o de entrar no tile)."""
+    height, width = len(costs), len(costs[0])
+    dist = [[INF] * width for _ in range(height)]
+    if costs[ly][lx] is None:
+        return dist
+    dist[ly][lx] = 0
+    heap = [(0, lx, ly)]
+    while heap:
+        d, x, y = heapq.heappop(heap)
+        if d > dist[y][x]:
+            continue
+        for dx, dy in NEIGHBOR_OFFSETS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and costs[ny][nx] is not None:
+                nd = d + (costs[y][x] if reverse else costs[ny][nx])
+                if nd < dist[ny][nx]:
+                    dist[ny][nx] = nd
+                    heapq.heappush(heap, (nd, nx, ny))
+    return dist
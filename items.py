@@ -1,12 +1,205 @@
+from settings import CLASS_STATS, PHYSICAL
+
+ITEM_FIELDS = ("name", "type", "slot", "power", "defense", "damage_type", "price")
+
 class Item:
-    def __init__(self, name, type_, slot=None, power=0, defense=0, damage_type=None, price=0):
-        self.name = name
-        self.type = type_
-        self.slot = slot
-        self.power = power
-        self.defense = defense
-        self.damage_type = damage_type
-        self.price = price
+    """Definição imutável de um item, compartilhada (flyweight) por todos os inventários, baús e tabelas de loot.
+
+    Itens são criados pelo item_catalog, que guarda uma única instância por definição e lhe dá um id
+    inteiro; o que é de cada instância (a quantidade) fica no Inventory."""
+
+    __slots__ = ("id",) + ITEM_FIELDS
+
+    def __init__(self, name, type_, slot=None, power=0, defense=0, damage_type=None, price=0, id=None):
+        set_field = object.__setattr__
+        set_field(self, "id", id)
+        set_field(self, "name", name)
+        set_field(self, "type", type_)
+        set_field(self, "slot", slot)
+        set_field(self, "power", power)
+        set_field(self, "defense", defense)
+        set_field(self, "damage_type", damage_type)
+        set_field(self, "price", price)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Itens são imutáveis; use o item_catalog para obter outra definição")
 
     def __str__(self):
-        return f"{self.name} ({self.type})"
\ No newline at end of file
+        return f"{self.name} ({self.type})"
+
+    def definition(self):
+        return tuple(getattr(self, field) for field in ITEM_FIELDS)
+
+    def stack_key(self):
+        """Itens com a mesma chave são idênticos e podem ser empilhados."""
+        return self.id if self.id is not None else self.definition()
+
+    def to_dict(self):
+        return dict(zip(ITEM_FIELDS, self.definition()))
+
+    @staticmethod
+    def from_dict(data):
+        return item_catalog.intern(data["name"], data.get("type", data.get("type_")), data.get("slot"), data.get("power", 0),
+                                   data.get("defense", 0), data.get("damage_type"), data.get("price", 0))
+
+class ItemCatalog:
+    """Registro de todas as definições de itens, cada uma com um id inteiro estável durante a execução."""
+
+    def __init__(self, definitions=()):
+        self.by_id = []
+        self.by_definition = {}
+        self.by_name = {}
+        for definition in definitions:
+            self.intern(*definition)
+
+    def intern(self, name, type_, slot=None, power=0, defense=0, damage_type=None, price=0):
+        """A instância única da definição dada, criando-a se ainda não existir."""
+        definition = (name, type_, slot, power, defense, damage_type, price)
+        item = self.by_definition.get(definition)
+        if item is None:
+            item = Item(*definition, id=len(self.by_id))
+            self.by_id.append(item)
+            self.by_definition[definition] = item
+            self.by_name.setdefault(name, item)
+        return item
+
+    def __getitem__(self, name):
+        """Definição padrão do item com esse nome."""
+        return self.by_name[name]
+
+    def get(self, item_id):
+        return self.by_id[item_id]
+
+    def __len__(self):
+        return len(self.by_id)
+
+# Itens do jogo: (nome, tipo, slot, poder, defesa, tipo de dano, preço)
+ITEM_DEFINITIONS = [
+    ("Poção", "consumable", None, 0, 0, None, 10),
+    ("Poção de Mana", "consumable", None, 0, 0, None, 15),
+    ("Poção Forte", "consumable", None, 0, 0, None, 50),
+    ("Espada de Ferro", "weapon", "weapon", CLASS_STATS["Guerreiro"]["weapon_power"], 0, PHYSICAL, 20),
+    ("Cajado Simples", "weapon", "weapon", CLASS_STATS["Mago"]["weapon_power"], 0, PHYSICAL, 15),
+    ("Arco Curto", "weapon", "weapon", CLASS_STATS["Arqueiro"]["weapon_power"], 0, PHYSICAL, 18),
+    ("Espada Longa", "weapon", "weapon", 12, 0, PHYSICAL, 100),
+    ("Lâmina do Rei Caído", "weapon", None, 50, 0, PHYSICAL, 0),
+    ("Armadura de Couro", "armor", "chest", 0, 5, None, 50),
+    ("Elmo de Ferro", "armor", "helmet", 0, 4, None, 80),
+    ("Pele de Lobo", "material", None, 0, 0, None, 0),
+    ("Minério de Ferro", "material", None, 0, 0, None, 0),
+    ("Erva Curativa", "material", None, 0, 0, None, 0),
+    ("Fragmento de Poder", "material", None, 0, 0, None, 0),
+    ("Poeira Mágica", "material", None, 0, 0, None, 0),
+]
+
+item_catalog = ItemCatalog(ITEM_DEFINITIONS)
+
+class Inventory:
+    """Inventário que empilha itens idênticos e mantém índices por nome, tipo e slot.
+
+    Iterar percorre cada unidade (como na antiga lista de itens), mas contagens e buscas por nome
+    são O(1) e listar por tipo ou slot custa O(k) nas pilhas encontradas, sem varrer o inventário."""
+
+    INDEXED = ("name", "type", "slot")
+
+    def __init__(self, items=()):
+        self.stacks = {} # chave do item -> [item, quantidade], na ordem em que a pilha surgiu
+        self.counts = {} # nome -> quantidade total
+        self.index = {attr: {} for attr in self.INDEXED} # atributo -> valor -> {chave da pilha: None}
+        self.size = 0
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for item, count in list(self.stacks.values()):
+            for _ in range(count):
+                yield item
+
+    def __contains__(self, name):
+        return self.counts.get(name, 0) > 0
+
+    def add(self, item, count=1):
+        key = item.stack_key()
+        stack = self.stacks.get(key)
+        if stack is None:
+            self.stacks[key] = [item, count]
+            for attr in self.INDEXED:
+                self.index[attr].setdefault(getattr(item, attr), {})[key] = None
+        else:
+            stack[1] += count
+        self.counts[item.name] = self.counts.get(item.name, 0) + count
+        self.size += count
+
+    append = add
+
+    def remove(self, item, count=1):
+        """Remove unidades da pilha do item; ValueError se não houver o bastante (como list.remove)."""
+        key = item.stack_key()
+        stack = self.stacks.get(key)
+        if stack is None or stack[1] < count:
+            raise ValueError(f"{item.name} não está no inventário")
+        stack[1] -= count
+        if stack[1] == 0:
+            del self.stacks[key]
+            for attr in self.INDEXED:
+                keys = self.index[attr][getattr(item, attr)]
+                del keys[key]
+                if not keys:
+                    del self.index[attr][getattr(item, attr)]
+        self.counts[item.name] -= count
+        if not self.counts[item.name]:
+            del self.counts[item.name]
+        self.size -= count
+
+    def count(self, name):
+        return self.counts.get(name, 0)
+
+    def has(self, name, count=1):
+        return self.counts.get(name, 0) >= count
+
+    def first(self, name, slot=None):
+        """Primeiro item com esse nome (e slot, se dado), ou None."""
+        for key in self.index["name"].get(name, ()):
+            item = self.stacks[key][0]
+            if slot is None or item.slot == slot:
+                return item
+        return None
+
+    def take(self, name, count=1):
+        """Retira count unidades com esse nome (de uma ou mais pilhas). Tudo ou nada: retorna a lista
+        de itens retirados, ou [] se não houver unidades suficientes."""
+        if self.counts.get(name, 0) < count:
+            return []
+        taken = []
+        for key in list(self.index["name"][name]):
+            item, available = self.stacks[key]
+            n = min(available, count - len(taken))
+            self.remove(item, n)
+            taken.extend([item] * n)
+            if len(taken) == count:
+                break
+        return taken
+
+    def stacks_by(self, attr, *values):
+        """Pilhas [(item, quantidade)] cujo atributo indexado tem algum dos valores dados."""
+        return [tuple(self.stacks[key]) for value in values for key in self.index[attr].get(value, ())]
+
+    def by_type(self, *types):
+        return self.stacks_by("type", *types)
+
+    def by_slot(self, *slots):
+        return self.stacks_by("slot", *slots)
+
+    def to_dict(self):
+        return [dict(item.to_dict(), count=count) for item, count in self.stacks.values()]
+
+    @staticmethod
+    def from_dict(data):
+        """Aceita pilhas ({..., "count": n}) ou a antiga lista com um dicionário por unidade."""
+        inventory = Inventory()
+        for item_data in data:
+            inventory.add(Item.from_dict(item_data), item_data.get("count", 1))
+        return inventory
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from settings import LEVEL_CACHE_SIZE
+from map import GameMap
+from enemy import Enemy, enemy_pool
+
+class LevelCache:
+    """Cache LRU dos níveis visitados, indexado pelo número do nível.
+
+    Os níveis mais recentes ficam inteiros em memória (mapa, inimigos e baús). Ao sair do cache,
+    um nível vira só um delta pequeno: a semente e as alterações do mapa mais o estado dos inimigos,
+    e é reconstruído a partir disso na próxima visita."""
+
+    def __init__(self, seed, populate, max_levels=LEVEL_CACHE_SIZE, world_store=None):
+        self.seed = seed
+        self.populate = populate # populate(game_map, player) -> lista de inimigos de um nível novo
+        self.max_levels = max_levels
+        self.world_store = world_store # WorldStore opcional: níveis fora da memória também podem vir do banco
+        self.levels = OrderedDict() # nível -> (game_map, enemies, chests)
+        self.deltas = {} # nível -> {"map": GameMap.to_dict(), "enemies": [...]}
+
+    def store(self, level, game_map, enemies, chests):
+        self.levels[level] = (game_map, enemies, chests)
+        self.levels.move_to_end(level)
+        while len(self.levels) > self.max_levels:
+            self.evict(next(iter(self.levels)))
+
+    def evict(self, level):
+        game_map, enemies, _ = self.levels.pop(level)
+        self.deltas[level] = {"map": game_map.to_dict(), "enemies": [e.to_dict() for e in enemies]}
+        enemy_pool.release_all(enemies) # O nível agora é só o delta: os objetos podem ser reaproveitados
+
+    def clear(self):
+        """Descarta todos os níveis (ex.: ao começar outro jogo), devolvendo os inimigos ao pool."""
+        for _, enemies, _ in self.levels.values():
+            enemy_pool.release_all(enemies)
+        self.levels.clear()
+        self.deltas.clear()
+
+    def snapshot(self):
+        """Deltas de todos os níveis conhecidos ({nível: delta}), para gravar fora da thread principal."""
+        snapshot = dict(self.deltas)
+        for level, (game_map, enemies, _) in self.levels.items():
+            snapshot[level] = {"map": game_map.to_dict(), "enemies": [e.to_dict() for e in enemies]}
+        return snapshot
+
+    def load(self, level, player):
+        """Retorna (game_map, enemies, chests) do nível, do cache, do delta ou gerando-o pela primeira vez."""
+        if level in self.levels:
+            self.levels.move_to_end(level)
+            return self.levels[level]
+
+        chests = []
+        delta = self.deltas.pop(level, None)
+        if delta is None and self.world_store is not None:
+            delta = self.world_store.load_level(level)
+        if delta:
+            game_map = GameMap.from_dict(delta["map"], level, chests)
+            enemies = [Enemy.from_dict(e) for e in delta["enemies"]]
+            game_map.occupy_all(enemies)
+        else:
+            game_map = GameMap(level, chests, seed=self.seed)
+            enemies = self.populate(game_map, player)
+        self.store(level, game_map, enemies, chests)
+        return game_map, enemies, chests
@@ -1,107 +1,167 @@
-import pygame, sys, random, json, os
+import pygame, sys, random, json, os, time, sqlite3
+import game_input
+import save_format
 from settings import *
 from player import Player
-from enemy import Enemy, Boss
+from enemy import Enemy, enemy_pool
 from map import GameMap
 from battle import Battle
 from inventory import InventoryScreen
 from npc import NPC, Quest
-from items import Item
+from items import item_catalog
 from spells import Spell
 from status_effects import StatusEffect
 from chest import TreasureChest
 from skill_tree import SkillTreeScreen, SKILL_LIST
 from crafting import CraftingScreen
+from render import DirtyRectTracker
+from level_cache import LevelCache
+from assets import assets
+from text_cache import get_font
+from spatial import SpatialHash
+from timing import FixedTimestep
+from scenes import Scene, SceneManager
+from autosave import SaveWriter
+from world_store import WorldStore
 
 pygame.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Runas Perdidas")
-battle_background = pygame.image.load("assets/battle_background.png").convert()
+battle_background = assets.image("battle_background.png")
 clock = pygame.time.Clock()
-SAVE_FILE = "savegame.json"
-
-def save_game(player, enemies, npcs, chests, current_level):
-    # Função para converter um item para um dicionário, trocando 'type_' por 'type'
-    def item_to_dict(item):
-        if not item: return None
-        item_dict = vars(item).copy()
-        if 'type_' in item_dict:
-            item_dict['type'] = item_dict.pop('type_')
-        return item_dict
-
+sim_clock = FixedTimestep()
+map_message_font = get_font("Arial", 20)
+dirty_tracker = DirtyRectTracker()
+SAVE_FILE = "savegame.sav"
+LEGACY_SAVE_FILE = "savegame.json" # Saves antigos em JSON ainda podem ser carregados
+# Mundo persistente opcional em SQLite: guarda todos os níveis visitados, não só o atual
+world_store = WorldStore() if WORLD_STORE_ENABLED else None
+
+def snapshot_game(player, enemies, npcs, current_level, game_map, level_cache=None):
+    """Retrato do estado salvável em dicionários e listas novos, sem referências aos objetos do jogo.
+    É tirado na thread principal e pode ser gravado em outra thread enquanto o jogo continua.
+    O nível atual vai como semente e deltas ("world"); os baús são regenerados a partir dela, exceto
+    os que vieram de um save antigo, que vão junto no "world".
+    Com o WorldStore, inclui em "levels" os deltas de todos os níveis do level_cache."""
     player_data = player.to_dict()
 
-    enemies_data = [{"x": e.x, "y": e.y, "level": e.level, "is_boss": isinstance(e, Boss)} for e in enemies]
-    npcs_data = [{"x": n.x, "y": n.y, "name": n.name, "quest": vars(n.quest) if n.quest else None} for n in npcs]
-    chests_data = [
-        {
-            "x": c.x, "y": c.y, "gold": c.gold, "is_opened": c.is_opened,
-            "items": [item_to_dict(i) for i in c.items]
-        } for c in chests
-    ]
+    enemies_data = [e.to_dict() for e in enemies]
+    npcs_data = [{"x": n.x, "y": n.y, "name": n.name, "quest": n.quest.to_dict() if n.quest else None} for n in npcs]
     
-    save_data = {"player": player_data, "enemies": enemies_data, "npcs": npcs_data, "chests": chests_data, "current_level": current_level}
-    with open(SAVE_FILE, 'w') as f:
-        json.dump(save_data, f, indent=4)
+    save_data = {"player": player_data, "enemies": enemies_data, "npcs": npcs_data, "current_level": current_level,
+                 "world": game_map.to_dict()}
+    if world_store is not None and level_cache is not None:
+        save_data["levels"] = level_cache.snapshot()
+    return save_data
+
+def write_snapshot(save_data):
+    if "levels" in save_data:
+        world_store.write_snapshot(save_data)
+    else:
+        save_format.write_save(SAVE_FILE, save_data)
+
+save_writer = SaveWriter(write_snapshot)
+
+def save_game(player, enemies, npcs, current_level, game_map, level_cache=None):
+    write_snapshot(snapshot_game(player, enemies, npcs, current_level, game_map, level_cache))
+
+def find_save_file():
+    """Save a carregar: o binário, ou o JSON antigo se ainda não houver um binário."""
+    for path in (SAVE_FILE, LEGACY_SAVE_FILE):
+        if os.path.exists(path):
+            return path
+    return None
+
+def delete_save_files():
+    save_writer.flush() # Um autosave em andamento recriaria o arquivo
+    for path in (SAVE_FILE, LEGACY_SAVE_FILE):
+        if os.path.exists(path): os.remove(path)
+    if world_store is not None:
+        world_store.clear()
+
+def has_saved_game():
+    return find_save_file() is not None or (world_store is not None and world_store.has_game())
+
+def set_aside_save_file(path):
+    """Renomeia um save ilegível em vez de apagá-lo, para que possa ser inspecionado ou recuperado."""
+    if os.path.exists(path): os.replace(path, path + ".corrupt")
 
 def load_game():
-    with open(SAVE_FILE, 'r') as f:
-        save_data = json.load(f)
+    if world_store is not None and world_store.has_game():
+        return load_game_from_store()
+    path = find_save_file()
+    if path == SAVE_FILE:
+        save_data = save_format.read_save(path)
+    else:
+        with open(path, 'r') as f:
+            save_data = json.load(f)
     
-    all_spells = SKILL_LIST["Guerreiro"] + SKILL_LIST["Mago"] + SKILL_LIST["Arqueiro"]
-
-    player = Player.from_dict(save_data["player"], all_spells)
+    player = Player.from_dict(save_data["player"], all_spells())
 
     chests = []
-    for c_data in save_data.get("chests", []):
-        items = []
-        for item_data in c_data.get("items", []):
-            if 'type' in item_data:
-                item_data['type_'] = item_data.pop('type')
-            items.append(Item(**item_data))
-        
-        chest = TreasureChest(c_data['x'], c_data['y'], items, c_data.get('gold', 0))
-        chest.is_opened = c_data.get('is_opened', False)
-        chests.append(chest)
-        
     current_level = save_data.get("current_level", 1)
-    game_map = GameMap(current_level, chests)
+    world_data = save_data.get("world")
+    if world_data:
+        # Mapa e baús são regenerados pela semente; os deltas reaplicam tiles alterados e baús abertos
+        game_map = GameMap.from_dict(world_data, current_level, chests)
+    else:
+        # Save antigo sem semente: um mapa novo, mas com os baús que foram salvos no lugar dos gerados
+        game_map = GameMap(current_level, chests, streaming=False)
+        game_map.replace_chests([TreasureChest.from_dict(c_data) for c_data in save_data.get("chests", [])])
+
+    enemies = [Enemy.from_dict(e_data) for e_data in save_data.get("enemies", [])]
+    game_map.occupy_all(enemies)
+    npcs = npcs_from_data(save_data.get("npcs", []))
+    return player, game_map, enemies, npcs, chests, current_level
 
-    enemies = []
-    for e_data in save_data.get("enemies", []):
-        if e_data.get("is_boss"): enemies.append(Boss(e_data["x"], e_data["y"]))
-        else: enemies.append(Enemy(e_data["x"], e_data["y"], e_data["level"]))
-    
+def load_game_from_store():
+    """Carrega do WorldStore só o jogador, os NPCs e o nível atual; os outros níveis vêm sob demanda."""
+    player_data, npcs_data, current_level = world_store.load_state()
+    player = Player.from_dict(player_data, all_spells())
+    chests = []
+    level_data = world_store.load_level(current_level)
+    if level_data:
+        game_map = GameMap.from_dict(level_data["map"], current_level, chests)
+        enemies = [Enemy.from_dict(e_data) for e_data in level_data["enemies"]]
+        game_map.occupy_all(enemies)
+    else:
+        game_map = GameMap(current_level, chests)
+        enemies = populate_level(game_map, player)
+    return player, game_map, enemies, npcs_from_data(npcs_data), chests, current_level
+
+def all_spells():
+    return SKILL_LIST["Guerreiro"] + SKILL_LIST["Mago"] + SKILL_LIST["Arqueiro"]
+
+def npcs_from_data(npcs_data):
     npcs = []
-    for n_data in save_data.get("npcs", []):
-        quest = Quest(**n_data["quest"]) if n_data.get("quest") else None
+    for n_data in npcs_data:
+        quest = Quest.from_dict(n_data["quest"]) if n_data.get("quest") else None
         npcs.append(NPC(n_data["x"], n_data["y"], n_data["name"], quest))
+    return npcs
 
-    return player, game_map, enemies, npcs, chests, current_level
-
-def reset_game():
-    chosen_class = choose_class_screen()
+def reset_game(chosen_class=None):
+    chosen_class = chosen_class or choose_class_screen()
     player = Player(chosen_class)
     current_level = 1
     chests = []
     game_map = GameMap(current_level, chests)
-    enemies = spawn_enemies(game_map, player)
+    enemies = populate_level(game_map, player)
     quest1 = Quest("Caçador de Ratos", "Cace 5 inimigos.", 'kill', 'Enemy', 5, 100, 50)
     npcs = [NPC(12, 8, "Aldric", quest=quest1)]
     return player, game_map, enemies, npcs, chests, current_level
 
 def spawn_enemies(game_map, player, num=20):
-    enemies = []
-    for _ in range(num):
-        while True:
-            x, y = random.randint(1, MAP_WIDTH - 2), random.randint(1, MAP_HEIGHT - 2)
-            if game_map.is_walkable(x, y) and game_map.get_tile_type(x, y) == FLOOR:
-                enemies.append(Enemy(x, y, random.randint(game_map.level, game_map.level + 2)))
-                break
-    return enemies
+    area = None
+    if game_map.streaming:
+        # O mundo não existe inteiro em memória: sorteia posições nos chunks ao redor do jogador
+        radius = SPAWN_RADIUS
+        area = (player.x - radius, player.y - radius, 2 * radius + 1, 2 * radius + 1)
+    # Tiles de chão livres, sem repetição e fora do tile do jogador
+    positions = game_map.spawn_points(num, FLOOR, area=area, min_distance=SPAWN_MIN_DISTANCE, avoid=[(player.x, player.y)])
+    return [enemy_pool.acquire(x, y, random.randint(game_map.level, game_map.level + 2)) for x, y in positions]
 
 def start_menu():
-    font = pygame.font.SysFont("Arial", 40)
+    font = get_font("Arial", 40)
     title = font.render("Runas Perdidas", True, WHITE)
     new_game_rect = pygame.Rect(WIDTH/2 - 100, 250, 200, 50)
     load_game_rect = pygame.Rect(WIDTH/2 - 100, 320, 200, 50)
@@ -110,20 +170,21 @@ def start_menu():
         screen.blit(title, (WIDTH/2 - title.get_width()/2, 150))
         pygame.draw.rect(screen, (100,100,100), new_game_rect)
         screen.blit(font.render("Novo Jogo", True, WHITE), (new_game_rect.x + 20, new_game_rect.y + 5))
-        if os.path.exists(SAVE_FILE):
+        has_save = has_saved_game()
+        if has_save:
             pygame.draw.rect(screen, (100,100,100), load_game_rect)
             screen.blit(font.render("Carregar", True, WHITE), (load_game_rect.x + 35, load_game_rect.y + 5))
-        for event in pygame.event.get():
+        for event in game_input.get_events():
             if event.type == pygame.QUIT: pygame.quit(); sys.exit()
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if new_game_rect.collidepoint(event.pos): return "new"
-                if os.path.exists(SAVE_FILE) and load_game_rect.collidepoint(event.pos): return "load"
+                if has_save and load_game_rect.collidepoint(event.pos): return "load"
         pygame.display.flip()
         clock.tick(FPS)
 
 def choose_class_screen():
-    font_title = pygame.font.SysFont("Arial", 40)
-    font_desc = pygame.font.SysFont("Arial", 22)
+    font_title = get_font("Arial", 40)
+    font_desc = get_font("Arial", 22)
     classes = {
         "Guerreiro": {"desc": "HP Alto, Ataque Alto, Pouca Mana.", "rect": pygame.Rect(WIDTH/2 - 150, 200, 300, 50)},
         "Mago": {"desc": "HP Baixo, Mana Alta, Mestre das Magias.", "rect": pygame.Rect(WIDTH/2 - 150, 300, 300, 50)},
@@ -140,45 +201,63 @@ def choose_class_screen():
             screen.blit(class_text, (data["rect"].x + 10, data["rect"].y + 5))
             desc_text = font_desc.render(data["desc"], True, (200, 200, 200))
             screen.blit(desc_text, (data["rect"].x + 10, data["rect"].y + 55))
-        for event in pygame.event.get():
+        for event in game_input.get_events():
             if event.type == pygame.QUIT: pygame.quit(); sys.exit()
             if event.type == pygame.MOUSEBUTTONDOWN:
-                pos = pygame.mouse.get_pos()
                 for name, data in classes.items():
-                    if data["rect"].collidepoint(pos): return name
+                    if data["rect"].collidepoint(event.pos): return name
         pygame.display.flip()
         clock.tick(FPS)
 
-def shop_screen(screen, player):
-    shop_items = [Item("Poção", "consumable", price=10), Item("Poção de Mana", "consumable", price=15), Item("Armadura de Couro", "armor", slot="chest", defense=5, price=50), Item("Espada Longa", "weapon", slot="weapon", power=12, damage_type=PHYSICAL, price=100)]
-    font = pygame.font.SysFont("Arial", 22)
-    shopping = True
-    while shopping:
+SHOP_ITEMS = [item_catalog[name] for name in ("Poção", "Poção de Mana", "Armadura de Couro", "Espada Longa")]
+
+class ShopScene(Scene):
+    def __init__(self, player):
+        super().__init__()
+        self.player = player
+        self.font = get_font("Arial", 22)
+
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_e:
+            self.close()
+        elif pygame.K_1 <= event.key <= pygame.K_9:
+            idx = event.key - pygame.K_1
+            if idx < len(SHOP_ITEMS):
+                item = SHOP_ITEMS[idx]
+                if self.player.gold >= item.price:
+                    self.player.gold -= item.price
+                    self.player.inventory.add(item)
+                    self.mark_dirty()
+
+    def draw(self, screen):
+        font = self.font
         screen.fill(BLACK)
         text = font.render("Loja - Pressione [E] para sair", True, WHITE)
         screen.blit(text, (50, 50))
-        text = font.render(f"Seu Ouro: {player.gold}", True, (255, 255, 0))
+        text = font.render(f"Seu Ouro: {self.player.gold}", True, (255, 255, 0))
         screen.blit(text, (550, 50))
-        for i, item in enumerate(shop_items):
+        for i, item in enumerate(SHOP_ITEMS):
             item_text = f"{i+1}. {item.name} - Preço: {item.price} Ouro"
-            color = WHITE if player.gold >= item.price else (150, 150, 150)
+            color = WHITE if self.player.gold >= item.price else (150, 150, 150)
             screen.blit(font.render(item_text, True, color), (50, 100 + i * 40))
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_e: shopping = False
-                elif pygame.K_1 <= event.key <= pygame.K_9:
-                    idx = event.key - pygame.K_1
-                    if idx < len(shop_items):
-                        item = shop_items[idx]
-                        if player.gold >= item.price:
-                            player.gold -= item.price
-                            player.inventory.append(Item(name=item.name, type_=item.type, slot=item.slot, power=item.power, defense=item.defense, damage_type=item.damage_type, price=item.price))
 
 def spawn_boss(game_map):
-    boss_x, boss_y = MAP_WIDTH - 5, MAP_HEIGHT - 5
-    return Boss(boss_x, boss_y)
+    boss_x, boss_y = game_map.cols - 5, game_map.rows - 5
+    game_map.occupy(boss_x, boss_y)
+    return enemy_pool.acquire_boss(boss_x, boss_y)
+
+def populate_level(game_map, player):
+    """Inimigos de um nível gerado pela primeira vez."""
+    enemies = spawn_enemies(game_map, player)
+    if game_map.level == 3: enemies.append(spawn_boss(game_map))
+    return enemies
+
+def create_level_cache(game_map, enemies, chests, current_level):
+    level_cache = LevelCache(game_map.seed, populate_level, world_store=world_store)
+    level_cache.store(current_level, game_map, enemies, chests)
+    return level_cache
 
 # --- MELHORIA: Função para desenhar o HUD ---
 def draw_hud(screen, player):
@@ -187,7 +266,7 @@ def draw_hud(screen, player):
     hud_surface.fill((0, 0, 0, 150))
     screen.blit(hud_surface, (0, HEIGHT - 80))
 
-    font = pygame.font.SysFont("Arial", 18)
+    font = get_font("Arial", 18)
     
     # Vida
     hp_text = font.render(f"HP: {player.hp} / {player.max_hp}", True, WHITE)
@@ -216,179 +295,353 @@ def draw_hud(screen, player):
     screen.blit(level_text, (WIDTH - 150, HEIGHT - 40))
 # -------------------------------------------
 
-# --- Início do Jogo ---
-game_mode = start_menu()
-if game_mode == "new":
-    player, game_map, enemies, npcs, chests, current_level = reset_game()
-elif game_mode == "load" and os.path.exists(SAVE_FILE):
-    try:
-        player, game_map, enemies, npcs, chests, current_level = load_game()
-    except (json.JSONDecodeError, KeyError, TypeError) as e:
-        print(f"Arquivo de save corrompido ou inválido ({e}). Iniciando novo jogo.")
-        if os.path.exists(SAVE_FILE): os.remove(SAVE_FILE)
-        player, game_map, enemies, npcs, chests, current_level = reset_game()
-else:
-    player, game_map, enemies, npcs, chests, current_level = reset_game()
-
-battle = None
-player_dead = False
-running = True
-map_message = ""
-map_message_timer = 0
-# --- NOVAS VARIÁVEIS PARA VANTAGEM DO ARQUEIRO ---
-projectile_path = []
-projectile_timer = 0
-# ------------------------------------------------
-
-while running:
-    screen.fill(BLACK)
-    keys = pygame.key.get_pressed()
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            save_game(player, enemies, npcs, chests, current_level)
-            running = False
-        if not battle and event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_i: InventoryScreen(screen, player).run()
-            if event.key == pygame.K_k: SkillTreeScreen(screen, player).run()
-            if event.key == pygame.K_c: CraftingScreen(screen, player).run()
-            
-            # --- LÓGICA DA VANTAGEM DO ARQUEIRO ---
-            if event.key == pygame.K_a:
-                if player.character_class == "Arqueiro" and player.ranged_shot_cooldown == 0:
-                    player.ranged_shot_cooldown = 60  # Cooldown de 60 frames (aprox. 1 segundo)
-                    projectile_path.clear()
-                    projectile_timer = 20  # Duração visual do rastro da flecha
-                    
-                    dx, dy = player.last_direction
-                    shot_hit = False
-                    for i in range(1, 8):  # Alcance de 7 tiles
-                        check_x, check_y = player.x + dx * i, player.y + dy * i
-                        
-                        if not game_map.is_walkable(check_x, check_y):
-                            projectile_path.append((check_x, check_y))
-                            break  # Flecha atinge a parede
-
-                        projectile_path.append((check_x, check_y))
-
-                        for enemy in enemies:
-                            if enemy.x == check_x and enemy.y == check_y:
-                                damage_dealt = 20  # Dano base do tiro à distância
-                                enemy.hp -= damage_dealt
-                                map_message = f"Tiro certeiro! Você causou {damage_dealt} de dano!"
-                                map_message_timer = 100
-                                
-                                battle = Battle(screen, player, enemy, battle_background)
-                                shot_hit = True
-                                break
-                        if shot_hit:
-                            break
-            # -----------------------------------------
-
-            if event.key == pygame.K_e:
-                if game_map.get_tile_type(player.x, player.y) == SHOP: shop_screen(screen, player)
-                for npc in npcs:
-                    if abs(player.x - npc.x) <= 1 and abs(player.y - npc.y) <= 1: npc.interact(screen, player)
-                for chest in chests:
-                    if not chest.is_opened and abs(player.x - chest.x) <= 1 and abs(player.y - chest.y) <= 1:
-                        map_message = chest.interact(player)
-                        map_message_timer = 100
-
-    if player_dead:
-        font = pygame.font.SysFont("Arial", 50)
-        text = font.render("Você morreu! Pressione R para reiniciar.", True, (255, 0, 0))
-        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2))
-        if keys[pygame.K_r]:
-            if os.path.exists(SAVE_FILE): os.remove(SAVE_FILE)
-            player, game_map, enemies, npcs, chests, current_level = reset_game()
-            player_dead = False
-        pygame.display.flip()
-        clock.tick(FPS)
-        continue
+def get_camera(player, game_map):
+    camera_x = max(0, min(player.x * TILE_SIZE - WIDTH // 2, game_map.cols * TILE_SIZE - WIDTH))
+    camera_y = max(0, min(player.y * TILE_SIZE - HEIGHT // 2, game_map.rows * TILE_SIZE - HEIGHT))
+    return camera_x, camera_y
+
+def get_view_rect(camera_x, camera_y):
+    """Retângulo de tiles (coluna, linha, colunas, linhas) visível com a câmera dada."""
+    view_start_col = camera_x // TILE_SIZE
+    view_end_col = view_start_col + (WIDTH // TILE_SIZE) + 1
+    view_start_row = camera_y // TILE_SIZE
+    view_end_row = view_start_row + (HEIGHT // TILE_SIZE) + 1
+    return view_start_col, view_start_row, view_end_col - view_start_col + 1, view_end_row - view_start_row + 1
+
+def get_map_message_rect(message):
+    return pygame.Rect(10, 10, map_message_font.size(message)[0] + 20, 40)
+
+def track_scene(tracker, player, game_map, npcs, visible_enemies, projectile_path, map_message, camera_x, camera_y):
+    """Registra no rastreador de retângulos sujos tudo o que será desenhado neste frame."""
+    tracker.track("player", player.get_draw_rect(camera_x, camera_y))
+    view_cols, view_rows = WIDTH // TILE_SIZE + 2, HEIGHT // TILE_SIZE + 2
+    for chest in game_map.chest_index.query_rect(camera_x // TILE_SIZE, camera_y // TILE_SIZE, view_cols, view_rows):
+        tracker.track(("chest", id(chest)), chest.get_draw_rect(camera_x, camera_y), chest.is_opened)
+    for npc in npcs:
+        tracker.track(("npc", id(npc)), npc.get_draw_rect(camera_x, camera_y))
+    for enemy in visible_enemies:
+        tracker.track(("enemy", id(enemy)), enemy.get_draw_rect(camera_x, camera_y), (enemy.hp, enemy.color))
+    for px, py in projectile_path:
+        tracker.track(("projectile", px, py), (px * TILE_SIZE - camera_x, py * TILE_SIZE - camera_y, TILE_SIZE, TILE_SIZE))
+    if map_message is not None:
+        tracker.track("message", get_map_message_rect(map_message), map_message)
+    hud_state = (player.hp, player.max_hp, player.mana, player.max_mana, player.gold, player.level, player.exp)
+    tracker.track("hud", (0, HEIGHT - 80, WIDTH, 80), hud_state)
 
-    if not battle:
-        player.update(keys, game_map)
+# --- Início do Jogo ---
+class GameScene(Scene):
+    """Exploração do mapa: roda a simulação em passos fixos e abre as outras telas por cima dela.
+
+    Não é ociosa: a cada volta do SceneManager avança o relógio, simula os passos devidos e redesenha
+    (a tela inteira ou só os retângulos sujos)."""
+
+    idle = False
+
+    def __init__(self, game_mode, character_class=None, max_ticks=None, ticks_per_frame=None, save_on_quit=True, autosave=True):
+        super().__init__()
+        self.character_class = character_class
+        self.max_ticks = max_ticks
+        self.ticks_per_frame = ticks_per_frame
+        self.save_on_quit = save_on_quit
+        self.autosave = autosave
+        self.next_autosave = sim_clock.ticks + AUTOSAVE_INTERVAL_TICKS
+        self.frames = 0
+        self.level_cache = None
+        if game_mode == "new":
+            self.new_game()
+        elif game_mode == "load" and has_saved_game():
+            from_store = world_store is not None and world_store.has_game()
+            try:
+                self.player, self.game_map, self.enemies, self.npcs, self.chests, self.current_level = load_game()
+                self.setup_level()
+            except (json.JSONDecodeError, save_format.SaveFormatError, KeyError, TypeError, sqlite3.Error) as e:
+                path = None if from_store else find_save_file()
+                if path is None:
+                    # Mundo do WorldStore ilegível: o new_game abaixo limpa o banco
+                    print(f"Mundo salvo corrompido ou inválido ({e}); iniciando novo jogo.")
+                else:
+                    print(f"Arquivo de save corrompido ou inválido ({e}). Guardado como {path}.corrupt; iniciando novo jogo.")
+                    set_aside_save_file(path)
+                self.new_game()
+        else:
+            self.new_game()
+
+        self.battle = None
+        self.player_dead = False
+        self.keys = None
+        self.map_message = ""
+        self.map_message_timer = 0
+        # --- NOVAS VARIÁVEIS PARA VANTAGEM DO ARQUEIRO ---
+        self.projectile_path = []
+        self.projectile_timer = 0
+        # ------------------------------------------------
+
+    def new_game(self):
+        if self.level_cache is not None:
+            self.level_cache.clear() # Recomeço (R após a morte): os inimigos do jogo anterior voltam ao pool
+        if world_store is not None:
+            # Os níveis do jogo anterior não podem voltar do banco no jogo novo
+            save_writer.flush()
+            world_store.clear()
+        self.player, self.game_map, self.enemies, self.npcs, self.chests, self.current_level = reset_game(self.character_class)
+        self.setup_level()
+
+    def setup_level(self):
+        self.level_cache = create_level_cache(self.game_map, self.enemies, self.chests, self.current_level)
+        # Índices espaciais das entidades do nível atual (os baús são indexados pelo próprio GameMap)
+        self.enemy_index = SpatialHash.from_entities(self.enemies)
+        self.npc_index = SpatialHash.from_entities(self.npcs)
+
+    def start_battle(self, enemy):
+        self.battle = Battle(screen, self.player, enemy, battle_background)
+        self.push(self.battle)
+
+    def on_resume(self, closed_scene):
+        super().on_resume(closed_scene)
+        dirty_tracker.force_full_redraw() # Telas modais cobrem o jogo inteiro
+        sim_clock.reset() # e pausam a simulação: o tempo passado nelas não é recuperado
+        if closed_scene is self.battle:
+            battle, self.battle = self.battle, None
+            if battle.player.hp <= 0: self.player_dead = True
+            elif battle.enemy.hp <= 0:
+                self.enemies.remove(battle.enemy)
+                self.enemy_index.remove(battle.enemy)
+                self.game_map.vacate(battle.enemy.x, battle.enemy.y)
+                enemy_pool.release(battle.enemy)
+            elif battle.fled: self.player.move(0, -1, self.game_map)
+
+    def snapshot(self):
+        return snapshot_game(self.player, self.enemies, self.npcs, self.current_level, self.game_map, self.level_cache)
+
+    def on_quit(self):
+        if self.save_on_quit:
+            save_writer.submit(self.snapshot())
+        save_writer.flush() # O processo não pode terminar no meio de uma gravação
+
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN or self.player_dead:
+            return
+        player, game_map = self.player, self.game_map
+        if event.key == pygame.K_i: self.push(InventoryScreen(player))
+        if event.key == pygame.K_k: self.push(SkillTreeScreen(player))
+        if event.key == pygame.K_c: self.push(CraftingScreen(player))
+
+        # --- LÓGICA DA VANTAGEM DO ARQUEIRO ---
+        if event.key == pygame.K_a:
+            if player.character_class == "Arqueiro" and player.ranged_shot_cooldown == 0:
+                player.ranged_shot_cooldown = 60  # Cooldown de 60 passos de simulação
+                self.projectile_path.clear()
+                self.projectile_timer = 20  # Duração visual do rastro da flecha, em passos
+
+                dx, dy = player.last_direction
+                for i in range(1, 8):  # Alcance de 7 tiles
+                    check_x, check_y = player.x + dx * i, player.y + dy * i
+
+                    if not game_map.is_walkable(check_x, check_y):
+                        self.projectile_path.append((check_x, check_y))
+                        break  # Flecha atinge a parede
+
+                    self.projectile_path.append((check_x, check_y))
+
+                    hit = self.enemy_index.query_point(check_x, check_y)
+                    if hit:
+                        damage_dealt = 20  # Dano base do tiro à distância
+                        hit[0].hp -= damage_dealt
+                        self.map_message = f"Tiro certeiro! Você causou {damage_dealt} de dano!"
+                        self.map_message_timer = 100
+                        self.start_battle(hit[0])
+                        break
+        # -----------------------------------------
+
+        if event.key == pygame.K_e:
+            if game_map.get_tile_type(player.x, player.y) == SHOP: self.push(ShopScene(player))
+            for npc in self.npc_index.query_radius(player.x, player.y, 1):
+                self.push(npc.interact(player))
+            for chest in game_map.chest_index.query_radius(player.x, player.y, 1):
+                if not chest.is_opened:
+                    self.map_message = chest.interact(player)
+                    self.map_message_timer = 100
+
+    def update(self):
+        self.frames += 1
+        self.mark_dirty()
+        if self.ticks_per_frame is None:
+            # Tempo real desde o último frame; a simulação decide quantos passos rodar
+            due_ticks = sim_clock.advance(clock.tick(FPS))
+        else:
+            clock.tick()
+            due_ticks = self.ticks_per_frame
+        if self.max_ticks is not None:
+            due_ticks = min(due_ticks, self.max_ticks - sim_clock.ticks)
+            if due_ticks <= 0 or self.player_dead:
+                self.manager.stop()
+                return
+        self.keys = game_input.get_pressed()
+
+        if self.player_dead:
+            if self.keys[pygame.K_r]:
+                delete_save_files()
+                self.new_game()
+                self.player_dead = False
+                sim_clock.reset()
+            return
+
+        # --- SIMULAÇÃO: passos fixos, quantos couberem no tempo real decorrido ---
+        # Se a renderização atrasar, vários passos rodam antes do próximo frame e a velocidade do jogo não muda
+        for _ in range(due_ticks):
+            self.step()
+            if self.battle or self.player.hp <= 0:
+                break
+        if self.player.hp <= 0:
+            self.player_dead = True
+        elif self.autosave and sim_clock.ticks >= self.next_autosave:
+            # Só o retrato é feito aqui; a gravação roda na thread do SaveWriter
+            save_writer.submit(self.snapshot())
+            self.next_autosave = sim_clock.ticks + AUTOSAVE_INTERVAL_TICKS
+
+    def update_enemy(self, enemy, ticks=1):
+        """Avança a IA do inimigo e, se ele andou, atualiza o índice espacial e a ocupação do mapa."""
+        old_position = (enemy.x, enemy.y)
+        enemy.update(self.player, self.game_map, ticks=ticks)
+        if (enemy.x, enemy.y) != old_position:
+            self.enemy_index.update(enemy)
+            self.game_map.move_occupant(old_position, (enemy.x, enemy.y))
+
+    def step(self):
+        """Um passo fixo da simulação."""
+        player, game_map = self.player, self.game_map
+        tick = sim_clock.step()
+        player.update(self.keys, game_map)
         current_tile = game_map.get_tile_type(player.x, player.y)
         if current_tile == LAVA:
             player.terrain_damage_timer += 1
             if player.terrain_damage_timer > 15:
                 player.take_damage(5)
-                map_message = "Você se queima na lava!"
-                map_message_timer = 50
+                self.map_message = "Você se queima na lava!"
+                self.map_message_timer = 50
                 player.terrain_damage_timer = 0
+        # Níveis visitados voltam do cache (ou do delta salvo) em vez de serem gerados de novo
         if current_tile == STAIRS_DOWN:
-            current_level += 1; chests.clear(); game_map = GameMap(current_level, chests)
-            enemies = spawn_enemies(game_map, player); player.x, player.y = 5, 6
-            if current_level == 3: enemies.append(spawn_boss(game_map))
+            self.level_cache.store(self.current_level, game_map, self.enemies, self.chests)
+            self.current_level += 1; player.x, player.y = 5, 6
+            game_map, self.enemies, self.chests = self.level_cache.load(self.current_level, player)
+            self.game_map = game_map
+            self.enemy_index = SpatialHash.from_entities(self.enemies)
         elif current_tile == STAIRS_UP:
-            current_level -= 1; chests.clear(); game_map = GameMap(current_level, chests)
-            enemies = spawn_enemies(game_map, player); player.x, player.y = MAP_WIDTH - 5, MAP_HEIGHT - 6
-
-    if player.hp <= 0:
-        player_dead = True
-        continue
-
-    camera_x = max(0, min(player.x * TILE_SIZE - WIDTH // 2, MAP_WIDTH * TILE_SIZE - WIDTH))
-    camera_y = max(0, min(player.y * TILE_SIZE - HEIGHT // 2, MAP_HEIGHT * TILE_SIZE - HEIGHT))
-
-    game_map.draw(screen, camera_x, camera_y)
-    player.draw(screen, camera_x, camera_y)
-
-    # --- DESENHO DO PROJÉTIL DO ARQUEIRO ---
-    if projectile_timer > 0:
-        for pos in projectile_path:
-            px, py = pos
-            rect = pygame.Rect(px * TILE_SIZE - camera_x + TILE_SIZE // 4, 
-                               py * TILE_SIZE - camera_y + TILE_SIZE // 4, 
-                               TILE_SIZE // 2, TILE_SIZE // 2)
-            pygame.draw.rect(screen, (200, 200, 0), rect) # Cor amarela para o rastro
-        projectile_timer -= 1
-        if projectile_timer == 0:
-            projectile_path.clear()
-    # -----------------------------------------
-
-    view_start_col = camera_x // TILE_SIZE
-    view_end_col = view_start_col + (WIDTH // TILE_SIZE) + 1
-    view_start_row = camera_y // TILE_SIZE
-    view_end_row = view_start_row + (HEIGHT // TILE_SIZE) + 1
-
-    if current_level == 1:
-        for npc in npcs:
-            if view_start_col <= npc.x <= view_end_col and view_start_row <= npc.y <= view_end_row:
-                npc.draw(screen, camera_x, camera_y)
+            self.level_cache.store(self.current_level, game_map, self.enemies, self.chests)
+            self.current_level -= 1; player.x, player.y = game_map.cols - 5, game_map.rows - 6
+            game_map, self.enemies, self.chests = self.level_cache.load(self.current_level, player)
+            self.game_map = game_map
+            self.enemy_index = SpatialHash.from_entities(self.enemies)
+
+        if player.hp <= 0:
+            return
+
+        # Inimigos na tela andam a cada passo; os de fora da tela, em rodízio, a cada
+        # OFFSCREEN_UPDATE_INTERVAL passos (acumulando esse tempo de uma vez)
+        enemy_index = self.enemy_index
+        on_screen = enemy_index.query_rect(*get_view_rect(*get_camera(player, game_map)))
+        for enemy in on_screen:
+            self.update_enemy(enemy)
+        on_screen = set(on_screen)
+        for enemy in self.enemies[tick % OFFSCREEN_UPDATE_INTERVAL::OFFSCREEN_UPDATE_INTERVAL]:
+            if enemy not in on_screen:
+                self.update_enemy(enemy, OFFSCREEN_UPDATE_INTERVAL)
+
+        if self.projectile_timer > 0:
+            self.projectile_timer -= 1
+            if self.projectile_timer == 0:
+                self.projectile_path.clear()
+        if self.map_message_timer > 0:
+            self.map_message_timer -= 1
+
+        # Encontro: algum inimigo ocupa o tile do jogador?
+        colliding = enemy_index.query_point(player.x, player.y)
+        if colliding and game_map.get_tile_type(player.x, player.y) not in [TOWN, SHOP]:
+            self.start_battle(colliding[0])
+
+    def draw(self, screen):
+        if self.player_dead:
+            screen.fill(BLACK)
+            dirty_tracker.force_full_redraw()
+            font = get_font("Arial", 50)
+            text = font.render("Você morreu! Pressione R para reiniciar.", True, (255, 0, 0))
+            screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2))
+            return None
+
+        player, game_map = self.player, self.game_map
+        camera_x, camera_y = get_camera(player, game_map)
+        view_rect = get_view_rect(camera_x, camera_y)
+        visible_npcs = []
+        if self.current_level == 1:
+            visible_npcs = self.npc_index.query_rect(*view_rect)
+        visible_enemies = self.enemy_index.query_rect(*view_rect)
+
+        # --- RENDERIZAÇÃO: tela inteira (dirty_rects None) ou só os retângulos que mudaram ---
+        dirty_rects = None
+        if DIRTY_RECT_RENDERING:
+            dirty_tracker.begin_frame(game_map, camera_x, camera_y)
+            track_scene(dirty_tracker, player, game_map, visible_npcs, visible_enemies,
+                        self.projectile_path if self.projectile_timer > 0 else [],
+                        self.map_message if self.map_message_timer > 0 else None, camera_x, camera_y)
+            dirty_rects = dirty_tracker.end_frame()
+            if not dirty_rects:
+                return dirty_rects
+            screen.set_clip(dirty_rects[0].unionall(dirty_rects[1:]))
 
-    visible_enemies = [e for e in enemies if view_start_col <= e.x <= view_end_col and view_start_row <= e.y <= view_end_row]
-    
-    for enemy in visible_enemies:
-        if not battle:
-            enemy.update(player, game_map)
-        enemy.draw(screen, camera_x, camera_y)
-        if not battle and pygame.Rect(player.x, player.y, 1, 1).colliderect(pygame.Rect(enemy.x, enemy.y, enemy.size/TILE_SIZE, enemy.size/TILE_SIZE)):
-            if game_map.get_tile_type(player.x, player.y) not in [TOWN, SHOP]:
-                battle = Battle(screen, player, enemy, battle_background)
-
-    if battle:
-        battle.run()
-        if battle.player.hp <= 0: player_dead = True
-        if not battle.running:
-            if battle.enemy.hp <= 0: enemies.remove(battle.enemy)
-            elif battle.fled: player.move(0, -1, game_map)
-            battle = None
-
-    if map_message_timer > 0:
-        font = pygame.font.SysFont("Arial", 20)
-        text = font.render(map_message, True, WHITE)
-        pygame.draw.rect(screen, BLACK, (10, 10, text.get_width() + 20, 40))
-        screen.blit(text, (20, 20))
-        map_message_timer -= 1
-
-    # --- MELHORIA: Desenha o HUD por cima de tudo ---
-    if not battle and not player_dead:
+        screen.fill(BLACK)
+        game_map.draw(screen, camera_x, camera_y)
+        player.draw(screen, camera_x, camera_y)
+
+        # --- DESENHO DO PROJÉTIL DO ARQUEIRO ---
+        if self.projectile_timer > 0:
+            for pos in self.projectile_path:
+                px, py = pos
+                rect = pygame.Rect(px * TILE_SIZE - camera_x + TILE_SIZE // 4, 
+                                   py * TILE_SIZE - camera_y + TILE_SIZE // 4, 
+                                   TILE_SIZE // 2, TILE_SIZE // 2)
+                pygame.draw.rect(screen, (200, 200, 0), rect) # Cor amarela para o rastro
+        # -----------------------------------------
+
+        for npc in visible_npcs:
+            npc.draw(screen, camera_x, camera_y)
+        for enemy in visible_enemies:
+            enemy.draw(screen, camera_x, camera_y)
+
+        if self.map_message_timer > 0:
+            text = map_message_font.render(self.map_message, True, WHITE)
+            pygame.draw.rect(screen, BLACK, get_map_message_rect(self.map_message))
+            screen.blit(text, (20, 20))
+
+        # --- MELHORIA: Desenha o HUD por cima de tudo ---
         draw_hud(screen, player)
-    # -----------------------------------------------
-
-    pygame.display.flip()
-    clock.tick(FPS)
-
-pygame.quit()
-sys.exit()
+        # -----------------------------------------------
+
+        if dirty_rects is not None:
+            screen.set_clip(None)
+        return dirty_rects
+
+def run_game(game_mode=None, character_class=None, max_ticks=None, ticks_per_frame=None, save_on_quit=True, autosave=True):
+    """Executa o jogo até o jogador sair e retorna estatísticas da execução.
+
+    Sem argumentos é o jogo normal: menu inicial, escolha de classe e simulação no ritmo do relógio real.
+    game_mode ("new" ou "load") e character_class pulam os menus. Com ticks_per_frame, cada frame
+    simula exatamente esse número de passos, sem esperar o relógio (o runner headless usa isso para
+    rodar o mais rápido possível). max_ticks encerra a execução depois desse número de passos (ou na
+    morte do jogador). save_on_quit salva ao fechar a janela e autosave salva em segundo plano a cada
+    AUTOSAVE_INTERVAL_TICKS passos."""
+    started = time.perf_counter()
+    if game_mode is None:
+        game_mode = start_menu()
+    game = GameScene(game_mode, character_class, max_ticks, ticks_per_frame, save_on_quit, autosave)
+    manager = SceneManager(screen)
+    manager.push(game)
+    manager.run()
+    save_writer.flush()
+    return {"ticks": sim_clock.ticks, "frames": game.frames, "seconds": time.perf_counter() - started,
+            "player_dead": game.player_dead, "level": game.current_level}
+
+if __name__ == "__main__":
+    run_game()
+    pygame.quit()
+    sys.exit()
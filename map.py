@@ -1,111 +1,531 @@
 import pygame
+import numpy as np
+from collections import OrderedDict
 from settings import *
 from chest import TreasureChest
-from items import Item
+from items import item_catalog
+from assets import assets
+from spatial import SpatialHash
+from free_tiles import FreeTileIndex
+from pathfinding import FlowField, a_star
+from hpa import HierarchicalPathfinder
 import random
 
+# Tile do atlas desenhado por cima do chão base para cada tipo de tile
+TILE_ATLAS_NAMES = {WALL: "wall", TOWN: "town", SHOP: "shop", LAVA: "lava", SWAMP: "swamp", STAIRS_DOWN: "stairs_down", STAIRS_UP: "stairs_up"}
+
 class GameMap:
-    def __init__(self, level, chests):
-        self.cols = MAP_WIDTH
-        self.rows = MAP_HEIGHT
-        self.tiles = [[FLOOR for _ in range(self.cols)] for _ in range(self.rows)]
+    def __init__(self, level, chests, streaming=WORLD_STREAMING, seed=None):
         self.chests = chests
         self.level = level
+        # Modo mundo em streaming: chunks gerados sob demanda a partir de uma semente determinística
+        self.streaming = streaming
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        # Alterações feitas no nível, por chunk: (cx, cy) -> {"tiles": {(x, y): tipo}, "opened_chests": {(x, y)}}
+        # Com a semente, bastam para reconstruir o nível depois
+        self.chunk_deltas = {}
 
-        self.background_tile = pygame.image.load("assets/background_tile.png").convert()
-        self.shop_tile = pygame.image.load("assets/shop.png").convert_alpha()
-        self.lava_tile = pygame.Surface((TILE_SIZE, TILE_SIZE)); self.lava_tile.fill((255, 69, 0))
-        self.swamp_tile = pygame.Surface((TILE_SIZE, TILE_SIZE)); self.swamp_tile.fill((88, 60, 33))
-        self.stairs_down_tile = pygame.Surface((TILE_SIZE, TILE_SIZE)); self.stairs_down_tile.fill((70, 70, 70))
-        self.stairs_up_tile = pygame.Surface((TILE_SIZE, TILE_SIZE)); self.stairs_up_tile.fill((150, 150, 150))
+        if self.streaming:
+            self.cols = WORLD_WIDTH
+            self.rows = WORLD_HEIGHT
+            self.loaded_chunks = OrderedDict() # (cx, cy) -> array uint8 (LRU)
+            self.chunk_chests = {} # (cx, cy) -> baús gerados naquele chunk
+        else:
+            self.cols = MAP_WIDTH
+            self.rows = MAP_HEIGHT
+            # Grade compacta uint8 com uma borda extra de paredes: consultas de vizinhos nunca saem do array
+            self.grid = np.full((self.rows + 2, self.cols + 2), WALL, dtype=np.uint8)
+            self.grid[1:-1, 1:-1] = FLOOR
+            self.tiles = self.grid[1:-1, 1:-1] # Visão sem a borda, indexada por [y, x]
+        self._walkable = None # Máscara de tiles caminháveis (com borda), refeita só quando os tiles mudam
+        self.version = 0 # Incrementada a cada mudança de tiles; invalida caches de caminhos
+        self._flow_field = None
+        self.path_cache = OrderedDict() # (início, alvo, versão, orçamento, parcial) -> caminho A* (LRU)
+        self._hierarchy = None # Grafo do pathfinding hierárquico, criado na primeira busca longa
+        # Tiles com entidades paradas ou andando em cima (baús, inimigos): (x, y) -> quantidade
+        self.occupants = {}
+        self._free_tiles = None # FreeTileIndex do mapa limitado, criado no primeiro sorteio
+        # Baús vindos de um save antigo, que a semente não sabe regenerar: são salvos por inteiro
+        self.saved_chests = False
 
-        self.generate_map()
+        # Cache LRU de blocos (chunks) do terreno estático já renderizados: (cx, cy) -> Surface
+        self.chunk_surfaces = OrderedDict()
 
-    def generate_map(self):
-        # Bordas
-        for y in range(self.rows):
-            for x in range(self.cols):
-                if x == 0 or y == 0 or x == self.cols - 1 or y == self.rows - 1:
-                    self.tiles[y][x] = WALL
+        if not self.streaming:
+            self.generate_map()
+        # Índice espacial dos baús (no streaming é mantido conforme os chunks entram e saem)
+        self.chest_index = SpatialHash.from_entities(self.chests)
 
+    def get_landmarks(self):
+        """Construções fixas do nível: lista de (x, y, largura, altura, tipo)."""
+        landmarks = []
         if self.level == 1:
             # Cidade e Loja
-            for y in range(5, 15):
-                for x in range(5, 15): self.tiles[y][x] = TOWN
-            self.tiles[8][12] = SHOP
-            # Escada para o próximo nível
-            self.tiles[MAP_HEIGHT - 5][MAP_WIDTH - 5] = STAIRS_DOWN
-        
-        if self.level == 2:
+            landmarks.append((5, 5, 10, 10, TOWN))
+            landmarks.append((12, 8, 1, 1, SHOP))
+        if self.level in (2, 3):
             # Escada para voltar
-            self.tiles[5][5] = STAIRS_UP
+            landmarks.append((5, 5, 1, 1, STAIRS_UP))
+        if self.level in (1, 2):
             # Escada para o próximo nível
-            self.tiles[MAP_HEIGHT - 5][MAP_WIDTH - 5] = STAIRS_DOWN
-            # Adicionar pântano
-            for _ in range(5):
-                rx, ry = random.randint(10, MAP_WIDTH-10), random.randint(10, MAP_HEIGHT-10)
-                for y in range(ry-3, ry+3):
-                    for x in range(rx-3, rx+3):
-                        if self.is_on_map(x, y): self.tiles[y][x] = SWAMP
-        
-        if self.level == 3:
-            # Escada para voltar
-            self.tiles[5][5] = STAIRS_UP
-            # Adicionar lava
+            landmarks.append((self.cols - 5, self.rows - 5, 1, 1, STAIRS_DOWN))
+        return landmarks
+
+    def get_hazard_tile(self):
+        """Terreno perigoso espalhado pelo nível (pântano no 2, lava no 3)."""
+        return {2: SWAMP, 3: LAVA}.get(self.level)
+
+    def generate_map(self):
+        # Gerador próprio do nível: a mesma semente sempre gera o mesmo mapa
+        rng = random.Random(hash((self.seed, self.level)))
+
+        # Bordas
+        self.tiles[0, :] = WALL
+        self.tiles[-1, :] = WALL
+        self.tiles[:, 0] = WALL
+        self.tiles[:, -1] = WALL
+
+        for x, y, width, height, tile_type in self.get_landmarks():
+            self.tiles[y:y + height, x:x + width] = tile_type
+
+        # Adicionar pântano ou lava
+        hazard = self.get_hazard_tile()
+        if hazard is not None:
             for _ in range(5):
-                rx, ry = random.randint(10, MAP_WIDTH-10), random.randint(10, MAP_HEIGHT-10)
-                for y in range(ry-3, ry+3):
-                    for x in range(rx-3, rx+3):
-                        if self.is_on_map(x, y): self.tiles[y][x] = LAVA
-
-        # Obstáculos e Baús genéricos para todos os níveis (exceto cidade)
-        for y in range(self.rows):
-            for x in range(self.cols):
-                if self.tiles[y][x] == FLOOR:
-                    if random.random() < 0.05: self.tiles[y][x] = WALL
-                    elif random.random() < 0.005:
-                        gold = random.randint(10, 50)
-                        item = Item("Poção", "consumable", price=10) if random.random() < 0.5 else None
-                        self.chests.append(TreasureChest(x, y, items=[item] if item else [], gold=gold))
+                rx, ry = rng.randint(10, MAP_WIDTH-10), rng.randint(10, MAP_HEIGHT-10)
+                self.tiles[max(0, ry-3):ry+3, max(0, rx-3):rx+3] = hazard
+
+        # Obstáculos genéricos para todos os níveis (exceto cidade)
+        for y, x in zip(*np.nonzero(self.tiles == FLOOR)):
+            if rng.random() < 0.05: self.tiles[y, x] = WALL
+        self.invalidate()
+
+        # Baús sorteados sem repetição entre os tiles de chão livres
+        for x, y in self.spawn_points(int(self.free_tiles.count(FLOOR) * CHEST_DENSITY), FLOOR,
+                                      min_distance=CHEST_MIN_DISTANCE, rng=rng):
+            self.chests.append(self.generate_chest(x, y, rng))
+
+    def generate_chest(self, x, y, rng):
+        gold = rng.randint(10, 50)
+        item = item_catalog["Poção"] if rng.random() < 0.5 else None
+        return TreasureChest(x, y, items=[item] if item else [], gold=gold)
+
+    # --- Mundo em streaming ---
+    def generate_chunk(self, cx, cy):
+        """Gera de forma determinística o terreno e os baús de um chunk do mundo em streaming."""
+        rng = random.Random(hash((self.seed, self.level, cx, cy)))
+        x0, y0 = cx * MAP_CHUNK_SIZE, cy * MAP_CHUNK_SIZE
+        width, height = min(MAP_CHUNK_SIZE, self.cols - x0), min(MAP_CHUNK_SIZE, self.rows - y0)
+
+        # Partes do chunk fora do mundo ficam como parede
+        tiles = np.full((MAP_CHUNK_SIZE, MAP_CHUNK_SIZE), WALL, dtype=np.uint8)
+        tiles[:height, :width] = FLOOR
+        if x0 == 0: tiles[:, 0] = WALL
+        if y0 == 0: tiles[0, :] = WALL
+        if x0 + width == self.cols: tiles[:, width - 1] = WALL
+        if y0 + height == self.rows: tiles[height - 1, :] = WALL
+
+        for x, y, w, h, tile_type in self.get_landmarks():
+            lx0, ly0 = max(x, x0) - x0, max(y, y0) - y0
+            lx1, ly1 = min(x + w, x0 + width) - x0, min(y + h, y0 + height) - y0
+            if lx0 < lx1 and ly0 < ly1:
+                tiles[ly0:ly1, lx0:lx1] = tile_type
+
+        hazard = self.get_hazard_tile()
+        if hazard is not None and rng.random() < 0.3:
+            rx, ry = rng.randint(0, width - 1), rng.randint(0, height - 1)
+            area = tiles[max(0, ry-3):min(height, ry+3), max(0, rx-3):min(width, rx+3)]
+            area[area == FLOOR] = hazard
+
+        for ly, lx in zip(*np.nonzero(tiles == FLOOR)):
+            if rng.random() < 0.05: tiles[ly, lx] = WALL
+        free_tiles = FreeTileIndex.from_tiles(tiles, origin=(x0, y0))
+        chests = [self.generate_chest(x, y, rng) for x, y in
+                  free_tiles.sample(FLOOR, int(free_tiles.count(FLOOR) * CHEST_DENSITY), rng, CHEST_MIN_DISTANCE)]
+
+        # Reaplica as alterações persistidas deste chunk
+        delta = self.chunk_deltas.get((cx, cy))
+        if delta:
+            for (x, y), tile_type in delta["tiles"].items():
+                tiles[y - y0, x - x0] = tile_type
+            for chest in chests:
+                if (chest.x, chest.y) in delta["opened_chests"]:
+                    chest.is_opened = True
+        return tiles, chests
+
+    def get_data_chunk(self, cx, cy):
+        """Retorna os tiles de um chunk em streaming, gerando-o e descartando os menos usados se preciso."""
+        key = (cx, cy)
+        tiles = self.loaded_chunks.get(key)
+        if tiles is not None:
+            self.loaded_chunks.move_to_end(key)
+            return tiles
+
+        tiles, chests = self.generate_chunk(cx, cy)
+        self.loaded_chunks[key] = tiles
+        self.chunk_chests[key] = chests
+        self.chests.extend(chests)
+        for chest in chests:
+            self.chest_index.insert(chest)
+        while len(self.loaded_chunks) > WORLD_MAX_LOADED_CHUNKS:
+            self.evict_chunk(next(iter(self.loaded_chunks)))
+        return tiles
+
+    def evict_chunk(self, key):
+        self.save_chunk_state(key)
+        del self.loaded_chunks[key]
+        self.chunk_surfaces.pop(key, None)
+        for chest in self.chunk_chests.pop(key, []):
+            self.chests.remove(chest)
+            self.chest_index.remove(chest)
+
+    def get_chunk_delta(self, key):
+        return self.chunk_deltas.setdefault(key, {"tiles": {}, "opened_chests": set()})
+
+    def save_chunk_state(self, key):
+        """Guarda no delta do chunk os baús abertos; só chunks alterados têm delta."""
+        opened = {(c.x, c.y) for c in self.chunk_chests.get(key, []) if c.is_opened}
+        if opened:
+            self.get_chunk_delta(key)["opened_chests"] |= opened
+
+    def to_dict(self):
+        """Estado persistente do nível: a semente e apenas os chunks alterados."""
+        if self.streaming:
+            for key in self.loaded_chunks:
+                self.save_chunk_state(key)
+        else:
+            for chest in self.chests:
+                if chest.is_opened:
+                    self.get_chunk_delta((chest.x // MAP_CHUNK_SIZE, chest.y // MAP_CHUNK_SIZE))["opened_chests"].add((chest.x, chest.y))
+        data = {
+            "streaming": self.streaming,
+            "seed": self.seed,
+            "chunk_deltas": [
+                {"cx": cx, "cy": cy,
+                 "tiles": [[x, y, int(t)] for (x, y), t in delta["tiles"].items()],
+                 "opened_chests": [list(pos) for pos in delta["opened_chests"]]}
+                for (cx, cy), delta in self.chunk_deltas.items()
+            ]
+        }
+        if self.saved_chests:
+            data["chests"] = [chest.to_dict() for chest in self.chests]
+        return data
+
+    def load_deltas(self, deltas_data):
+        for d in deltas_data:
+            self.chunk_deltas[(d["cx"], d["cy"])] = {
+                "tiles": {(x, y): t for x, y, t in d["tiles"]},
+                "opened_chests": {tuple(pos) for pos in d["opened_chests"]}
+            }
+        if self.streaming:
+            return # Aplicados quando cada chunk for gerado
+
+        # O mapa limitado já foi gerado: aplica os deltas de uma vez
+        opened = set()
+        for delta in self.chunk_deltas.values():
+            for (x, y), tile_type in delta["tiles"].items():
+                self.tiles[y, x] = tile_type
+            opened |= delta["opened_chests"]
+        for chest in self.chests:
+            if (chest.x, chest.y) in opened:
+                chest.is_opened = True
+        self.invalidate()
+
+    @staticmethod
+    def from_dict(data, level, chests):
+        """Reconstrói um nível a partir da semente e dos deltas salvos por to_dict."""
+        game_map = GameMap(level, chests, streaming=data.get("streaming", True), seed=data["seed"])
+        game_map.load_deltas(data.get("chunk_deltas", []))
+        if "chests" in data:
+            game_map.replace_chests([TreasureChest.from_dict(c_data) for c_data in data["chests"]])
+        return game_map
+    # ---------------------------
 
     def is_on_map(self, x, y):
         return 0 <= x < self.cols and 0 <= y < self.rows
 
+    def invalidate(self):
+        """Descarta a máscara de caminhabilidade e os chunks renderizados após mudanças em massa."""
+        self._walkable = None
+        self._hierarchy = None
+        self._free_tiles = None
+        self.chunk_surfaces.clear()
+        self.version += 1
+
+    @property
+    def walkable_mask(self):
+        """Máscara booleana (com a borda de 1 tile) dos tiles caminháveis, indexada por [y + 1, x + 1].
+        Só existe no mapa limitado; o mundo em streaming não tem uma grade inteira em memória."""
+        if self._walkable is None:
+            self._walkable = self.grid != WALL
+        return self._walkable
+
     def is_walkable(self, x, y):
-        return self.is_on_map(x, y) and self.tiles[y][x] != WALL
+        if self.streaming:
+            return self.get_tile_type(x, y) not in (WALL, -1)
+        return self.is_on_map(x, y) and bool(self.walkable_mask[y + 1, x + 1])
 
     def get_tile_type(self, x, y):
         if self.is_on_map(x, y):
-            return self.tiles[y][x]
+            if self.streaming:
+                return int(self.get_data_chunk(x // MAP_CHUNK_SIZE, y // MAP_CHUNK_SIZE)[y % MAP_CHUNK_SIZE, x % MAP_CHUNK_SIZE])
+            return int(self.tiles[y, x])
         return -1
 
+    def set_tile(self, x, y, tile_type):
+        """Altera um tile e invalida apenas o chunk pré-renderizado que o contém."""
+        if not self.is_on_map(x, y) or self.get_tile_type(x, y) == tile_type:
+            return
+        key = (x // MAP_CHUNK_SIZE, y // MAP_CHUNK_SIZE)
+        self.get_chunk_delta(key)["tiles"][(x, y)] = tile_type
+        if self.streaming:
+            self.get_data_chunk(*key)[y % MAP_CHUNK_SIZE, x % MAP_CHUNK_SIZE] = tile_type
+        else:
+            self.tiles[y, x] = tile_type
+            if self._walkable is not None:
+                self._walkable[y + 1, x + 1] = tile_type != WALL
+            if self._free_tiles is not None and self._free_tiles.remove((x, y)) is not None:
+                self._free_tiles.add((x, y), tile_type)
+        self.chunk_surfaces.pop(key, None)
+        if self._hierarchy is not None:
+            self._hierarchy.invalidate_tile(x, y)
+        self.version += 1
+
+    def get_flow_field(self, target_x, target_y):
+        """Campo de fluxo compartilhado até (target_x, target_y); só é recalculado quando o alvo
+        muda de tile ou o mapa muda."""
+        field = self._flow_field
+        if field is None or field.target != (target_x, target_y) or field.version != self.version:
+            field = self._flow_field = FlowField(self, target_x, target_y)
+        return field
+
+    @property
+    def hierarchy(self):
+        if self._hierarchy is None:
+            self._hierarchy = HierarchicalPathfinder(self)
+        return self._hierarchy
+
+    def is_long_range(self, start, goal):
+        """A busca atravessa clusters suficientes para o grafo hierárquico compensar (ver HPA_MIN_DISTANCE)."""
+        return abs(goal[0] - start[0]) + abs(goal[1] - start[1]) >= HPA_MIN_DISTANCE
+
+    def find_path(self, start, goal, max_expansions=PATH_MAX_EXPANSIONS, allow_partial=False):
+        """Caminho de start até goal (sem o ponto inicial), guardado num pequeno cache LRU.
+        Distâncias longas usam o grafo hierárquico; as curtas (ou se ele falhar), A* direto.
+        O resultado é uma tupla compartilhada pelo cache."""
+        key = (start, goal, self.version, max_expansions, allow_partial)
+        path = self.path_cache.get(key)
+        if path is None:
+            path = tuple(self.hierarchy.find_path(start, goal)) if self.is_long_range(start, goal) else ()
+            if not path:
+                path = tuple(a_star(self, start, goal, max_expansions, allow_partial))
+            self.path_cache[key] = path
+            if len(self.path_cache) > PATH_CACHE_SIZE:
+                self.path_cache.popitem(last=False)
+        else:
+            self.path_cache.move_to_end(key)
+        return path
+
+    def next_step(self, start, goal, allow_partial=False):
+        """Próximo tile de start em direção a goal, ou None. Em distâncias longas refina só o primeiro
+        trecho do caminho hierárquico, então o custo não cresce com a distância."""
+        if self.is_long_range(start, goal):
+            path = self.hierarchy.find_path(start, goal, first_segment_only=True)
+            if path:
+                return path[0]
+        path = self.find_path(start, goal, allow_partial=allow_partial)
+        return path[0] if path else None
+
+    def get_region(self, x, y, width, height):
+        """Cópia (height, width) dos tiles de uma região retangular; fora do mapa vira parede."""
+        region = np.full((height, width), WALL, dtype=np.uint8)
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, self.cols), min(y + height, self.rows)
+        if x0 >= x1 or y0 >= y1:
+            return region
+        if not self.streaming:
+            region[y0 - y:y1 - y, x0 - x:x1 - x] = self.tiles[y0:y1, x0:x1]
+            return region
+        for cy in range(y0 // MAP_CHUNK_SIZE, (y1 - 1) // MAP_CHUNK_SIZE + 1):
+            for cx in range(x0 // MAP_CHUNK_SIZE, (x1 - 1) // MAP_CHUNK_SIZE + 1):
+                chunk = self.get_data_chunk(cx, cy)
+                cx0, cy0 = cx * MAP_CHUNK_SIZE, cy * MAP_CHUNK_SIZE
+                sx0, sy0 = max(x0, cx0), max(y0, cy0)
+                sx1, sy1 = min(x1, cx0 + MAP_CHUNK_SIZE), min(y1, cy0 + MAP_CHUNK_SIZE)
+                region[sy0 - y:sy1 - y, sx0 - x:sx1 - x] = chunk[sy0 - cy0:sy1 - cy0, sx0 - cx0:sx1 - cx0]
+        return region
+
+    # --- Consultas vetorizadas sobre a grade ---
+    def positions_of(self, tile_type, area=None):
+        """Retorna um array (N, 2) com as coordenadas (x, y) de todos os tiles do tipo dado.
+        area=(x, y, largura, altura) limita a busca; no mundo em streaming ela é obrigatória."""
+        if area is None:
+            ys, xs = np.nonzero(self.tiles == tile_type)
+            return np.column_stack((xs, ys))
+        x, y, width, height = area
+        ys, xs = np.nonzero(self.get_region(x, y, width, height) == tile_type)
+        return np.column_stack((xs + x, ys + y))
+
+    # --- Ocupação e pontos de surgimento ---
+    @property
+    def free_tiles(self):
+        """Índice dos tiles livres do mapa limitado, mantido por set_tile, occupy e vacate."""
+        if self._free_tiles is None:
+            self._free_tiles = FreeTileIndex.from_tiles(self.tiles, occupied=self.occupants)
+        return self._free_tiles
+
+    def occupy(self, x, y):
+        pos = (x, y)
+        n = self.occupants.get(pos, 0)
+        self.occupants[pos] = n + 1
+        if n == 0 and self._free_tiles is not None:
+            self._free_tiles.remove(pos)
+
+    def vacate(self, x, y):
+        pos = (x, y)
+        n = self.occupants.get(pos, 0)
+        if n > 1:
+            self.occupants[pos] = n - 1
+            return
+        self.occupants.pop(pos, None)
+        if n == 1 and self._free_tiles is not None:
+            self._free_tiles.add(pos, int(self.tiles[y, x]))
+
+    def move_occupant(self, old, new):
+        if old != new:
+            self.vacate(*old)
+            self.occupy(*new)
+
+    def replace_chests(self, chests):
+        """Troca os baús do mapa limitado (mantendo a mesma lista, compartilhada com o jogo).
+        Os baús passam a ser salvos por inteiro; um baú que caiu numa parede deste mapa ganha chão
+        embaixo dele, gravado como delta."""
+        for chest in self.chests:
+            self.chest_index.remove(chest)
+            self.vacate(chest.x, chest.y)
+        self.chests[:] = chests
+        for chest in self.chests:
+            if not self.is_walkable(chest.x, chest.y):
+                self.set_tile(chest.x, chest.y, FLOOR)
+            self.chest_index.insert(chest)
+            self.occupy(chest.x, chest.y)
+        self.saved_chests = True
+
+    def occupy_all(self, entities):
+        for entity in entities:
+            self.occupy(entity.x, entity.y)
+
+    def spawn_points(self, count, tile_type=FLOOR, area=None, min_distance=0, avoid=(), rng=random):
+        """Sorteia sem reposição até count tiles livres do tipo e os marca como ocupados.
+
+        No mapa limitado o sorteio usa o índice free_tiles (O(1) por ponto); com area=(x, y, largura,
+        altura), obrigatória no mundo em streaming, um índice só da região é montado na hora.
+        min_distance > 0 garante esse espaçamento mínimo (disco de Poisson, ver FreeTileIndex.sample).
+        As posições de avoid (ex.: a do jogador) não são sorteadas nem ficam ocupadas."""
+        if area is not None:
+            x, y, width, height = area
+            region = self.get_region(x, y, width, height) # No streaming, carrega os chunks (e seus baús)
+            blocked = set(self.occupants)
+            blocked.update(avoid)
+            blocked.update((c.x, c.y) for c in self.chest_index.query_rect(x, y, width, height))
+            points = FreeTileIndex.from_tiles(region, (x, y), blocked).sample(tile_type, count, rng, min_distance)
+        else:
+            index = self.free_tiles
+            avoided = [(pos, index.remove(pos)) for pos in avoid]
+            points = index.sample(tile_type, count, rng, min_distance)
+            for pos, avoided_type in avoided:
+                if avoided_type is not None:
+                    index.add(pos, avoided_type)
+        for x, y in points:
+            self.occupy(x, y)
+        return points
+
+    def walkable_neighbors(self, positions):
+        """Para um array (N, 2) de posições (x, y), retorna um array booleano (N, 4)
+        indicando quais vizinhos em NEIGHBOR_OFFSETS são caminháveis."""
+        positions = np.asarray(positions, dtype=np.intp).reshape(-1, 2)
+        result = np.zeros((len(positions), len(NEIGHBOR_OFFSETS)), dtype=bool)
+        if self.streaming:
+            for n, (x, y) in enumerate(positions.tolist()):
+                if self.is_on_map(x, y):
+                    result[n] = [self.is_walkable(x + dx, y + dy) for dx, dy in NEIGHBOR_OFFSETS]
+            return result
+        mask = self.walkable_mask
+        inside = (positions[:, 0] >= 0) & (positions[:, 0] < self.cols) & (positions[:, 1] >= 0) & (positions[:, 1] < self.rows)
+        xs, ys = positions[inside, 0] + 1, positions[inside, 1] + 1
+        for i, (dx, dy) in enumerate(NEIGHBOR_OFFSETS):
+            result[inside, i] = mask[ys + dy, xs + dx]
+        return result
+
+    def region_mask(self, x, y, width, height, tile_types=None):
+        """Máscara booleana (height, width) de uma região retangular do mapa.
+        Sem tile_types marca os tiles caminháveis; com tile_types marca os tiles desses tipos.
+        Posições fora do mapa são sempre False."""
+        if not self.streaming and tile_types is None:
+            result = np.zeros((height, width), dtype=bool)
+            x0, y0 = max(x, 0), max(y, 0)
+            x1, y1 = min(x + width, self.cols), min(y + height, self.rows)
+            if x0 < x1 and y0 < y1:
+                result[y0 - y:y1 - y, x0 - x:x1 - x] = self.walkable_mask[y0 + 1:y1 + 1, x0 + 1:x1 + 1]
+            return result
+        region = self.get_region(x, y, width, height)
+        if tile_types is None:
+            return region != WALL
+        result = np.isin(region, tile_types)
+        # A parede usada para preencher o que está fora do mapa não conta
+        ys, xs = np.mgrid[y:y + height, x:x + width]
+        result &= (xs >= 0) & (xs < self.cols) & (ys >= 0) & (ys < self.rows)
+        return result
+
+    def draw_tile(self, surface, tile_type, draw_x, draw_y):
+        # Desenha o chão base e, por cima, o tile do tipo (ambos recortados do atlas compartilhado)
+        atlas = assets.get_atlas()
+        surface.blit(atlas, (draw_x, draw_y), assets.tile_rect("background"))
+        name = TILE_ATLAS_NAMES.get(int(tile_type))
+        if name:
+            surface.blit(atlas, (draw_x, draw_y), assets.tile_rect(name))
+
+    def build_chunk(self, cx, cy):
+        """Renderiza uma vez o terreno de um chunk numa Surface própria."""
+        start_x, start_y = cx * MAP_CHUNK_SIZE, cy * MAP_CHUNK_SIZE
+        width = min(MAP_CHUNK_SIZE, self.cols - start_x)
+        height = min(MAP_CHUNK_SIZE, self.rows - start_y)
+        tiles = self.get_region(start_x, start_y, width, height)
+
+        surface = pygame.Surface((width * TILE_SIZE, height * TILE_SIZE)).convert()
+        for y in range(height):
+            for x in range(width):
+                self.draw_tile(surface, tiles[y, x], x * TILE_SIZE, y * TILE_SIZE)
+        return surface
+
+    def get_chunk(self, cx, cy):
+        key = (cx, cy)
+        surface = self.chunk_surfaces.get(key)
+        if surface is None:
+            surface = self.build_chunk(cx, cy)
+            self.chunk_surfaces[key] = surface
+            while len(self.chunk_surfaces) > MAP_CHUNK_SURFACE_BUDGET:
+                self.chunk_surfaces.popitem(last=False)
+        else:
+            self.chunk_surfaces.move_to_end(key)
+        return surface
+
     def draw(self, screen, camera_x, camera_y):
-        # CORREÇÃO: Calcula os tiles visíveis na tela
+        # Calcula os tiles visíveis na tela
         start_col = camera_x // TILE_SIZE
         end_col = start_col + (WIDTH // TILE_SIZE) + 2
         start_row = camera_y // TILE_SIZE
         end_row = start_row + (HEIGHT // TILE_SIZE) + 2
 
-        # CORREÇÃO: Itera apenas sobre os tiles visíveis
-        for y in range(start_row, end_row):
-            for x in range(start_col, end_col):
-                if self.is_on_map(x, y):
-                    draw_x = x * TILE_SIZE - camera_x
-                    draw_y = y * TILE_SIZE - camera_y
-                    tile_type = self.tiles[y][x]
-
-                    # Desenha o chão base
-                    screen.blit(self.background_tile, (draw_x, draw_y))
-
-                    if tile_type == WALL: pygame.draw.rect(screen, (50, 50, 50), (draw_x, draw_y, TILE_SIZE, TILE_SIZE))
-                    elif tile_type == TOWN: pygame.draw.rect(screen, (210, 180, 140), (draw_x, draw_y, TILE_SIZE, TILE_SIZE))
-                    elif tile_type == SHOP: screen.blit(self.shop_tile, (draw_x, draw_y))
-                    elif tile_type == LAVA: screen.blit(self.lava_tile, (draw_x, draw_y))
-                    elif tile_type == SWAMP: screen.blit(self.swamp_tile, (draw_x, draw_y))
-                    elif tile_type == STAIRS_DOWN: screen.blit(self.stairs_down_tile, (draw_x, draw_y))
-                    elif tile_type == STAIRS_UP: screen.blit(self.stairs_up_tile, (draw_x, draw_y))
-        
-        for chest in self.chests:
-            # Otimização: só desenha baús que estão na tela
-            if start_col <= chest.x <= end_col and start_row <= chest.y <= end_row:
-                chest.draw(screen, camera_x, camera_y)
\ No newline at end of file
+        # OTIMIZAÇÃO: o terreno é desenhado em blocos pré-renderizados, poucos blits por frame
+        chunk_size_px = MAP_CHUNK_SIZE * TILE_SIZE
+        first_cx, first_cy = max(0, start_col // MAP_CHUNK_SIZE), max(0, start_row // MAP_CHUNK_SIZE)
+        last_cx = min((self.cols - 1) // MAP_CHUNK_SIZE, end_col // MAP_CHUNK_SIZE)
+        last_cy = min((self.rows - 1) // MAP_CHUNK_SIZE, end_row // MAP_CHUNK_SIZE)
+        for cy in range(first_cy, last_cy + 1):
+            for cx in range(first_cx, last_cx + 1):
+                screen.blit(self.get_chunk(cx, cy), (cx * chunk_size_px - camera_x, cy * chunk_size_px - camera_y))
+
+        # Otimização: só desenha baús que estão na tela
+        for chest in self.chest_index.query_rect(start_col, start_row, end_col - start_col + 1, end_row - start_row + 1):
+            chest.draw(screen, camera_x, camera_y)
@@ -1,5 +1,7 @@
 import pygame
+from scenes import Scene
 from settings import TILE_SIZE, WHITE, BLACK
+from text_cache import get_font
 
 class Quest:
     def __init__(self, title, description, goal_type, goal_target, goal_amount, reward_exp, reward_gold):
@@ -13,6 +15,18 @@ class Quest:
         self.current_amount = 0
         self.completed = False
 
+    def to_dict(self):
+        return vars(self).copy()
+
+    @staticmethod
+    def from_dict(data):
+        """Recria a quest com o progresso salvo (current_amount e completed)."""
+        data = dict(data)
+        current_amount, completed = data.pop("current_amount", 0), data.pop("completed", False)
+        quest = Quest(**data)
+        quest.current_amount, quest.completed = current_amount, completed
+        return quest
+
 class NPC:
     def __init__(self, x, y, name, quest=None):
         self.x = x
@@ -21,8 +35,7 @@ class NPC:
         self.quest = quest
         self.color = (0, 255, 255) # Ciano
         self.size = TILE_SIZE
-        self.font = pygame.font.SysFont("Arial", 18)
-        self.dialog_active = False
+        self.font = get_font("Arial", 18)
 
     def draw(self, screen, camera_x, camera_y):
         rect = pygame.Rect(
@@ -35,26 +48,30 @@ class NPC:
         name_text = self.font.render(self.name, True, WHITE)
         screen.blit(name_text, (rect.x, rect.y - 20))
 
-    def interact(self, screen, player):
-        self.dialog_active = True
-        while self.dialog_active:
-            self.draw_dialog_box(screen, player)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    exit()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_e: # Pressionar E para fechar
-                        self.dialog_active = False
-                    if event.key == pygame.K_y and self.quest and not player.quest: # Aceitar quest
-                        player.quest = self.quest
-                        self.dialog_active = False
-                    if event.key == pygame.K_c and player.quest and player.quest.completed: # Completar quest
-                        player.gain_exp(self.quest.reward_exp)
-                        player.gold += self.quest.reward_gold
-                        player.quest = None
-                        self.quest = None # NPC não oferece mais a quest
-                        self.dialog_active = False
+    def get_draw_rect(self, camera_x, camera_y):
+        """Área de tela ocupada pelo NPC e seu nome."""
+        rect = pygame.Rect(self.x * TILE_SIZE - camera_x, self.y * TILE_SIZE - camera_y, self.size, self.size)
+        name_w, name_h = self.font.size(self.name)
+        return rect.union(pygame.Rect(rect.x, rect.y - 20, name_w, name_h))
+
+    def interact(self, player):
+        """Cena de diálogo com este NPC, para ser empilhada sobre o jogo."""
+        return DialogScene(self, player)
+
+    def handle_dialog_key(self, key, player):
+        """Processa uma tecla do diálogo; retorna True se o diálogo terminou."""
+        if key == pygame.K_e: # Pressionar E para fechar
+            return True
+        if key == pygame.K_y and self.quest and not player.quest: # Aceitar quest
+            player.quest = self.quest
+            return True
+        if key == pygame.K_c and player.quest and player.quest.completed: # Completar quest
+            player.gain_exp(self.quest.reward_exp)
+            player.gold += self.quest.reward_gold
+            player.quest = None
+            self.quest = None # NPC não oferece mais a quest
+            return True
+        return False
 
     def draw_dialog_box(self, screen, player):
         box_rect = pygame.Rect(100, 400, 600, 150)
@@ -85,5 +102,22 @@ class NPC:
         else:
             text1 = self.font.render(f"{self.name}: Obrigado pela ajuda, herói!", True, WHITE)
             screen.blit(text1, (120, 420))
+        return box_rect
+
+class DialogScene(Scene):
+    """Caixa de diálogo de um NPC desenhada por cima da última imagem do jogo."""
+
+    def __init__(self, npc, player):
+        super().__init__()
+        self.npc = npc
+        self.player = player
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if self.npc.handle_dialog_key(event.key, self.player):
+                self.close()
+            else:
+                self.mark_dirty()
 
-        pygame.display.flip()
\ No newline at end of file
+    def draw(self, screen):
+        return [self.npc.draw_dialog_box(screen, self.player)]
\ No newline at end of file
@@ -0,0 +1,149 @@
+import heapq
+from settings import NEIGHBOR_OFFSETS, FLOW_FIELD_RADIUS, FLEE_FACTOR, PATH_MAX_EXPANSIONS, WALL, TILE_MOVE_COSTS
+
+INF = float("inf")
+
+def tile_cost(tile_type):
+    """Custo para entrar num tile do tipo dado, ou None se não for caminhável."""
+    if tile_type == WALL or tile_type == -1:
+        return None
+    return TILE_MOVE_COSTS.get(tile_type, 1)
+
+def reconstruct_path(parents, node):
+    """Refaz o caminho seguindo os ponteiros de pai, sem incluir o ponto inicial."""
+    path = []
+    while parents[node] is not None:
+        path.append(node)
+        node = parents[node]
+    path.reverse()
+    return path
+
+def a_star(game_map, start, goal, max_expansions=PATH_MAX_EXPANSIONS, allow_partial=False, bounds=None):
+    """A* com heurística de Manhattan e custo de terreno (TILE_MOVE_COSTS).
+
+    Expande no máximo max_expansions nós. Se o alvo não for alcançado, retorna [] ou, com
+    allow_partial, o caminho até o nó explorado mais próximo do alvo.
+    bounds=(x0, y0, x1, y1) restringe a busca a esse retângulo (x1 e y1 exclusivos)."""
+    if start == goal:
+        return []
+    gx, gy = goal
+    heuristic = lambda x, y: abs(gx - x) + abs(gy - y)
+
+    best, best_h = start, heuristic(*start)
+    open_heap = [(best_h, best_h, start)]
+    g_costs = {start: 0}
+    parents = {start: None}
+    closed = set()
+    expansions = 0
+
+    while open_heap:
+        _, h, node = heapq.heappop(open_heap)
+        if node in closed:
+            continue
+        if node == goal:
+            return reconstruct_path(parents, node)
+        closed.add(node)
+        expansions += 1
+        if expansions > max_expansions:
+            break
+        if h < best_h:
+            best, best_h = node, h
+
+        x, y = node
+        g = g_costs[node]
+        for dx, dy in NEIGHBOR_OFFSETS:
+            neighbor = (x + dx, y + dy)
+            if neighbor in closed:
+                continue
+            if bounds and not (bounds[0] <= neighbor[0] < bounds[2] and bounds[1] <= neighbor[1] < bounds[3]):
+                continue
+            cost = tile_cost(game_map.get_tile_type(*neighbor))
+            if cost is None:
+                continue
+            new_g = g + cost
+            if new_g < g_costs.get(neighbor, INF):
+                g_costs[neighbor] = new_g
+                parents[neighbor] = node
+                nh = heuristic(*neighbor)
+                heapq.heappush(open_heap, (new_g + nh, nh, neighbor))
+
+    if allow_partial and best != start:
+        return reconstruct_path(parents, best)
+    return []
+
+class FlowField:
+    """Campo de distâncias (Dijkstra) até um alvo, compartilhado por todos os inimigos que o perseguem.
+
+    É calculado uma vez numa janela de (2 * radius + 1) tiles ao redor do alvo; depois, cada inimigo
+    só precisa olhar os quatro vizinhos e descer o gradiente (next_step), em O(1).
+    O campo de fuga (flee_step) é derivado do mesmo campo e leva para longe do alvo contornando paredes."""
+
+    def __init__(self, game_map, target_x, target_y, radius=FLOW_FIELD_RADIUS):
+        self.target = (target_x, target_y)
+        self.version = game_map.version
+        self.radius = radius
+        self.size = 2 * radius + 1
+        self.x0, self.y0 = target_x - radius, target_y - radius
+        # Custo de entrar em cada tile da janela (None para paredes e fora do mapa)
+        region = game_map.get_region(self.x0, self.y0, self.size, self.size).tolist()
+        self.costs = [[tile_cost(t) for t in row] for row in region]
+        self.distances = self.dijkstra([(radius, radius, 0)])
+        self._flee_distances = None
+
+    def dijkstra(self, seeds):
+        """Distâncias mínimas a partir de várias sementes (lx, ly, custo inicial) dentro da janela."""
+        size, costs = self.size, self.costs
+        dist = [[INF] * size for _ in range(size)]
+        heap = []
+        for lx, ly, d in seeds:
+            if costs[ly][lx] is not None and d < dist[ly][lx]:
+                dist[ly][lx] = d
+                heap.append((d, lx, ly))
+        heapq.heapify(heap)
+
+        while heap:
+            d, lx, ly = heapq.heappop(heap)
+            if d > dist[ly][lx]:
+                continue
+            for dx, dy in NEIGHBOR_OFFSETS:
+                nx, ny = lx + dx, ly + dy
+                if 0 <= nx < size and 0 <= ny < size and costs[ny][nx] is not None:
+                    nd = d + costs[ny][nx]
+                    if nd < dist[ny][nx]:
+                        dist[ny][nx] = nd
+                        heapq.heappush(heap, (nd, nx, ny))
+        return dist
+
+    @property
+    def flee_distances(self):
+        # Campo de fuga: distâncias invertidas e escaladas, relaxadas de novo para contornar obstáculos
+        if self._flee_distances is None:
+            seeds = [(lx, ly, -FLEE_FACTOR * d)
+                     for ly, row in enumerate(self.distances) for lx, d in enumerate(row) if d != INF]
+            self._flee_distances = self.dijkstra(seeds)
+        return self._flee_distances
+
+    def distance(self, x, y):
+        lx, ly = x - self.x0, y - self.y0
+        if 0 <= lx < self.size and 0 <= ly < self.size:
+            return self.distances[ly][lx]
+        return INF
+
+    def descend(self, field, x, y):
+        lx, ly = x - self.x0, y - self.y0
+        if not (0 <= lx < self.size and 0 <= ly < self.size):
+            return None
+        best, best_value = None, field[ly][lx]
+        for dx, dy in NEIGHBOR_OFFSETS:
+            nx, ny = lx + dx, ly + dy
+            if 0 <= nx < self.size and 0 <= ny < self.size and field[ny][nx] < best_value:
+                best, best_value = (x + dx, y + dy), field[ny][nx]
+        return best
+
+    def next_step(self, x, y):
+        """Próximo tile em direção ao alvo, ou None se (x, y) está fora do campo ou sem caminho."""
+        return self.descend(self.distances, x, y)
+
+    def flee_step(self, x, y):
+        """Próximo tile para se afastar do alvo, ou None se não houver para onde fugir."""
+        return self.descend(self.flee_distances, x, y)
@@ -0,0 +1,46 @@
+import pygame
+
+class DirtyRectTracker:
+    """Acompanha o que foi desenhado em cada frame para atualizar só as áreas que mudaram.
+
+    A cada frame o loop principal registra, com track(), o retângulo de tela e o estado
+    visível de cada elemento (entidades, rótulos, HUD...). end_frame() compara com o frame
+    anterior e devolve os retângulos sujos, ou None quando a tela inteira precisa ser redesenhada
+    (primeiro frame, câmera rolou, mapa trocou ou uma tela modal cobriu o jogo)."""
+
+    def __init__(self):
+        self.previous = {}
+        self.current = {}
+        self.view = None
+        self.full_redraw = True
+
+    def force_full_redraw(self):
+        self.full_redraw = True
+
+    def begin_frame(self, game_map, camera_x, camera_y):
+        view = (game_map, camera_x, camera_y)
+        if self.view is None or self.view[0] is not game_map or self.view[1:] != view[1:]:
+            self.full_redraw = True
+        self.view = view
+        self.current = {}
+
+    def track(self, key, rect, state=None):
+        self.current[key] = (pygame.Rect(rect), state)
+
+    def end_frame(self):
+        previous, self.previous = self.previous, self.current
+        if self.full_redraw:
+            self.full_redraw = False
+            return None
+
+        dirty = []
+        for key, (rect, state) in self.current.items():
+            old = previous.pop(key, None)
+            if old is None:
+                dirty.append(rect)
+            elif old != (rect, state):
+                dirty.append(old[0])
+                dirty.append(rect)
+        # O que sumiu da tela também precisa ser apagado
+        dirty.extend(rect for rect, _ in previous.values())
+        return dirty
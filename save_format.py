@@ -0,0 +1,239 @@
+import os
+import struct
+import zlib
+from settings import EQUIPMENT_SLOTS, SAVE_COMPRESSION
+from items import ITEM_FIELDS # Campos de um item, na ordem em que ficam na tabela de itens
+
+# Cabeçalho: assinatura, versão do formato e flags
+MAGIC = b"RPSV"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBB")
+FLAG_ZLIB = 1
+
+EQUIP_KEYS = tuple(f"equipped_{slot}" for slot in EQUIPMENT_SLOTS)
+
+# Marcadores da codificação binária (no estilo do msgpack)
+T_NONE, T_FALSE, T_TRUE, T_INT, T_FLOAT, T_STR, T_LIST, T_DICT, T_STR_REF = range(9)
+FLOAT = struct.Struct("<d")
+
+class SaveFormatError(ValueError):
+    pass
+
+# --- Codificação binária ---
+def encode(value):
+    """Serializa None, bool, int, float, str, listas/tuplas e dicionários com chaves str.
+    Cada string repetida (chaves dos dicionários, nomes de itens...) é escrita uma vez e depois referenciada."""
+    out = bytearray()
+    strings = {}
+
+    def varint(n):
+        while n >= 0x80:
+            out.append((n & 0x7F) | 0x80)
+            n >>= 7
+        out.append(n)
+
+    def string(s):
+        ref = strings.get(s)
+        if ref is not None:
+            out.append(T_STR_REF)
+            varint(ref)
+            return
+        strings[s] = len(strings)
+        data = s.encode("utf-8")
+        out.append(T_STR)
+        varint(len(data))
+        out.extend(data)
+
+    def write(v):
+        if v is None:
+            out.append(T_NONE)
+        elif v is True:
+            out.append(T_TRUE)
+        elif v is False:
+            out.append(T_FALSE)
+        elif isinstance(v, int):
+            out.append(T_INT)
+            varint(v * 2 if v >= 0 else -v * 2 - 1) # zigzag: inteiros pequenos ocupam um byte
+        elif isinstance(v, float):
+            out.append(T_FLOAT)
+            out.extend(FLOAT.pack(v))
+        elif isinstance(v, str):
+            string(v)
+        elif isinstance(v, (list, tuple)):
+            out.append(T_LIST)
+            varint(len(v))
+            for item in v:
+                write(item)
+        elif isinstance(v, dict):
+            out.append(T_DICT)
+            varint(len(v))
+            for key, item in v.items():
+                string(key)
+                write(item)
+        elif hasattr(v, "__index__"):
+            write(v.__index__()) # Inteiros do numpy (posições e tipos de tile)
+        else:
+            raise SaveFormatError(f"Tipo não serializável: {type(v).__name__}")
+
+    write(value)
+    return bytes(out)
+
+def decode(data):
+    strings = []
+    pos = 0
+
+    def varint():
+        nonlocal pos
+        n = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            n |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return n
+            shift += 7
+
+    def read():
+        nonlocal pos
+        tag = data[pos]
+        pos += 1
+        if tag == T_INT:
+            n = varint()
+            return n >> 1 if not n & 1 else -((n + 1) >> 1)
+        if tag == T_STR_REF:
+            return strings[varint()]
+        if tag == T_STR:
+            length = varint()
+            s = data[pos:pos + length].decode("utf-8")
+            pos += length
+            strings.append(s)
+            return s
+        if tag == T_LIST:
+            return [read() for _ in range(varint())]
+        if tag == T_DICT:
+            result = {}
+            for _ in range(varint()):
+                key = read()
+                result[key] = read()
+            return result
+        if tag == T_NONE:
+            return None
+        if tag == T_TRUE:
+            return True
+        if tag == T_FALSE:
+            return False
+        if tag == T_FLOAT:
+            value = FLOAT.unpack_from(data, pos)[0]
+            pos += FLOAT.size
+            return value
+        raise SaveFormatError(f"Marcador desconhecido: {tag}")
+
+    try:
+        return read()
+    except (IndexError, UnicodeDecodeError, struct.error) as e:
+        raise SaveFormatError(f"Save truncado ou corrompido ({e})") from e
+
+# --- Tabela de itens ---
+class ItemTable:
+    """Itens distintos do save, cada um guardado uma vez e referenciado pela posição na tabela."""
+
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.index = {}
+
+    def intern(self, item_data):
+        row = tuple(item_data.get(field) for field in ITEM_FIELDS)
+        idx = self.index.get(row)
+        if idx is None:
+            idx = self.index[row] = len(self.rows)
+            self.rows.append(row)
+        return idx
+
+    def pack(self, items):
+        """Lista de itens ou pilhas ({..., "count": n}) -> [índice, quantidade, índice, quantidade, ...]:
+        itens iguais viram uma pilha, na ordem em que cada um aparece pela primeira vez."""
+        stacks = {}
+        for item_data in items:
+            idx = self.intern(item_data)
+            stacks[idx] = stacks.get(idx, 0) + item_data.get("count", 1)
+        return [n for stack in stacks.items() for n in stack]
+
+    def unpack(self, packed):
+        return [dict(zip(ITEM_FIELDS, self.rows[packed[i]]), count=packed[i + 1]) for i in range(0, len(packed), 2)]
+
+    def get(self, idx):
+        return None if idx is None else dict(zip(ITEM_FIELDS, self.rows[idx]))
+
+def compact(save_data):
+    """Troca os itens do save (no formato do JSON) por referências à tabela de itens."""
+    table = ItemTable()
+    player = dict(save_data["player"])
+    player["inventory"] = table.pack(player.get("inventory", []))
+    for key in EQUIP_KEYS:
+        player[key] = table.intern(player[key]) if player.get(key) else None
+    chests = [dict(c, items=table.pack(c.get("items", []))) for c in save_data.get("chests", [])]
+    return dict(save_data, player=player, chests=chests, items=[list(row) for row in table.rows])
+
+def expand(data):
+    """Inverso de compact: devolve o save no formato do JSON, com os itens como pilhas ({..., "count": n})."""
+    table = ItemTable([tuple(row) for row in data.pop("items")])
+    player = data["player"]
+    player["inventory"] = table.unpack(player.get("inventory", []))
+    for key in EQUIP_KEYS:
+        player[key] = table.get(player.get(key))
+    for chest in data.get("chests", []):
+        chest["items"] = table.unpack(chest.get("items", []))
+    return data
+
+# --- Arquivo ---
+def dumps(save_data, compress=SAVE_COMPRESSION):
+    payload = encode(compact(save_data))
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 6)
+        flags |= FLAG_ZLIB
+    return HEADER.pack(MAGIC, FORMAT_VERSION, flags) + payload
+
+def loads(data):
+    if len(data) < HEADER.size:
+        raise SaveFormatError("Save vazio ou truncado")
+    magic, version, flags = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SaveFormatError("Arquivo não é um save do jogo")
+    if version > FORMAT_VERSION:
+        raise SaveFormatError(f"Save da versão {version}, mais nova que a suportada ({FORMAT_VERSION})")
+    payload = data[HEADER.size:]
+    if flags & FLAG_ZLIB:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error as e:
+            raise SaveFormatError(f"Save corrompido ({e})") from e
+    return expand(decode(payload))
+
+def write_atomic(path, data):
+    """Grava num arquivo temporário ao lado do destino e o renomeia por cima dele.
+    Uma queda no meio da gravação deixa o save anterior intacto, nunca um arquivo pela metade."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    try:
+        # Garante que a renomeação em si também chegou ao disco
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return # Ex.: Windows, onde diretórios não podem ser abertos
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+def write_save(path, save_data, compress=SAVE_COMPRESSION):
+    write_atomic(path, dumps(save_data, compress))
+
+def read_save(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
@@ -0,0 +1,107 @@
+import pygame
+import game_input
+from settings import SCENE_IDLE_TIMEOUT_MS
+
+class Scene:
+    """Uma tela do jogo (exploração, batalha, inventário, diálogo...) empilhada no SceneManager.
+
+    Só a cena do topo recebe eventos, é atualizada e desenhada. Cenas com idle = True só mudam em
+    resposta à entrada: o gerenciador dorme em pygame.event.wait até chegar um evento e só as
+    redesenha quando elas se marcam como sujas (mark_dirty)."""
+
+    idle = True
+
+    def __init__(self):
+        self.manager = None
+        self.dirty = True
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def push(self, scene):
+        self.manager.push(scene)
+
+    def close(self):
+        """Remove esta cena da pilha (a de baixo volta a ser a ativa)."""
+        self.manager.pop(self)
+
+    def on_enter(self):
+        pass
+
+    def on_resume(self, closed_scene):
+        """Chamado quando a cena de cima (closed_scene) sai da pilha."""
+        self.mark_dirty()
+
+    def on_quit(self):
+        """Chamado para cada cena da pilha quando a janela é fechada."""
+        pass
+
+    def handle_event(self, event):
+        pass
+
+    def update(self):
+        pass
+
+    def draw(self, screen):
+        """Desenha a cena. Retorna None para atualizar a tela inteira ou uma lista de retângulos."""
+        pass
+
+class SceneManager:
+    """Pilha de cenas dona do único loop principal do jogo."""
+
+    def __init__(self, screen, idle_timeout=SCENE_IDLE_TIMEOUT_MS):
+        self.screen = screen
+        self.idle_timeout = idle_timeout
+        self.stack = []
+        self.running = False
+
+    @property
+    def top(self):
+        return self.stack[-1] if self.stack else None
+
+    def push(self, scene):
+        scene.manager = self
+        scene.mark_dirty()
+        self.stack.append(scene)
+        scene.on_enter()
+
+    def pop(self, scene=None):
+        scene = scene or self.top
+        if scene in self.stack:
+            self.stack.remove(scene)
+            if self.top is not None and scene is not None:
+                self.top.on_resume(scene)
+
+    def quit(self):
+        for scene in reversed(self.stack):
+            scene.on_quit()
+        self.running = False
+
+    def stop(self):
+        """Encerra o loop sem o tratamento de fechar a janela (ex.: fim de uma simulação)."""
+        self.running = False
+
+    def run(self):
+        self.running = True
+        while self.running and self.stack:
+            scene = self.top
+            # Cenas ociosas bloqueiam até o próximo evento (com timeout) em vez de girar a CPU
+            events = game_input.wait_events(self.idle_timeout) if scene.idle else game_input.get_events()
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.quit()
+                    break
+                if self.top is not None:
+                    self.top.handle_event(event)
+            if not self.running or not self.stack:
+                break
+
+            scene = self.top
+            scene.update()
+            if scene is self.top and scene.dirty:
+                scene.dirty = False
+                rects = scene.draw(self.screen)
+                if rects is None:
+                    pygame.display.flip()
+                elif rects:
+                    pygame.display.update(rects)
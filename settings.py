@@ -1,11 +1,57 @@
 WIDTH = 800
 HEIGHT = 600
 TILE_SIZE = 32
-FPS = 90
+FPS = 90 # Limite de frames renderizados por segundo
+# --- Simulação de passo fixo: todos os temporizadores do jogo contam passos, não frames ---
+SIM_TICK_RATE = 90 # Passos de simulação por segundo
+SIM_MAX_CATCHUP_TICKS = 10 # Máximo de passos recuperados num único frame atrasado
+OFFSCREEN_UPDATE_INTERVAL = 10 # Inimigos fora da tela são atualizados a cada N passos, em rodízio
+SCENE_IDLE_TIMEOUT_MS = 250 # Espera máxima por eventos em telas paradas (menus, batalha, diálogos)
+
+ASSETS_DIR = "assets"
+ASSET_CACHE_DIR = ".asset_cache" # Pixels já decodificados, para não decodificar os PNGs a cada execução
+TEXT_CACHE_SIZE = 512 # Textos renderizados mantidos em cache (LRU)
+
+# Modo de renderização por retângulos sujos: só atualiza na tela o que mudou (ideal para máquinas fracas)
+DIRTY_RECT_RENDERING = False
 
 MAP_WIDTH = 50
 MAP_HEIGHT = 50
 
+# Tamanho (em tiles) dos blocos pré-renderizados do mapa
+MAP_CHUNK_SIZE = 16
+# Máximo de blocos renderizados (Surfaces) mantidos em memória
+MAP_CHUNK_SURFACE_BUDGET = 24
+
+# Mundo em streaming: chunks gerados sob demanda a partir de uma semente
+WORLD_STREAMING = False
+WORLD_WIDTH = 100000
+WORLD_HEIGHT = 100000
+WORLD_MAX_LOADED_CHUNKS = 512 # Orçamento de memória: chunks de tiles carregados ao mesmo tempo
+FLOW_FIELD_RADIUS = 12 # Alcance (em tiles) do campo de fluxo compartilhado até o jogador
+FLEE_FACTOR = 1.2 # Quanto o campo de fuga prefere se afastar a contornar obstáculos
+PATH_MAX_EXPANSIONS = 2000 # Limite de nós expandidos por busca A*
+PATH_CACHE_SIZE = 64 # Caminhos A* recentes guardados por mapa
+HPA_CLUSTER_SIZE = 16 # Tamanho (em tiles) dos clusters do pathfinding hierárquico
+HPA_LONG_ENTRANCE = 6 # Trechos de fronteira com pelo menos essa largura ganham duas entradas
+HPA_MAX_EXPANSIONS = 400 # Limite de nós expandidos no grafo abstrato
+HPA_MAX_CLUSTERS = 1024 # Clusters do grafo abstrato mantidos em memória (LRU)
+# Buscas a partir dessa distância (Manhattan), que atravessam mais de um cluster, usam o grafo hierárquico.
+# Inimigos comuns só perseguem dentro de vision_range (e o campo de fluxo cobre FLOW_FIELD_RADIUS), então
+# hoje só o chefe, que persegue o jogador pelo nível todo, faz buscas tão longas
+HPA_MIN_DISTANCE = 2 * HPA_CLUSTER_SIZE
+SPATIAL_CELL_SIZE = 8 # Tamanho (em tiles) das células do índice espacial de entidades
+LEVEL_CACHE_SIZE = 3 # Níveis visitados mantidos inteiros em memória
+SAVE_COMPRESSION = True # Comprime (zlib) o save binário
+AUTOSAVE_INTERVAL_TICKS = 60 * SIM_TICK_RATE # Autosave a cada minuto de jogo
+# Mundo persistente em SQLite (modo WAL) com todos os níveis visitados, em vez do save de um nível só
+WORLD_STORE_ENABLED = False
+WORLD_STORE_FILE = "world.db"
+SPAWN_RADIUS = 24 # Raio (em tiles) ao redor do jogador onde inimigos surgem no mundo em streaming
+SPAWN_MIN_DISTANCE = 0 # Distância mínima (em tiles) entre inimigos sorteados num nível; 0 desliga o espaçamento
+CHEST_DENSITY = 0.005 # Baús gerados por tile de chão livre (no mapa limitado e em cada chunk do streaming)
+CHEST_MIN_DISTANCE = 4 # Distância mínima (em tiles) entre baús gerados
+
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 
@@ -19,10 +65,42 @@ STAIRS_UP = 5
 LAVA = 6
 SWAMP = 7
 
+# Custo de movimento (para a IA) ao entrar em cada tipo de tile; o padrão é 1
+TILE_MOVE_COSTS = {SWAMP: 3, LAVA: 8}
+
+# Deslocamentos (dx, dy) dos vizinhos ortogonais usados em buscas na grade
+NEIGHBOR_OFFSETS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
 # Tipos de Dano
 PHYSICAL = "physical"
 FIRE = "fire"
 ICE = "ice"
 LIGHTNING = "lightning"
 POISON = "poison"
-BURN = "burn"
\ No newline at end of file
+BURN = "burn"
+
+# Slots de equipamento do jogador e seus nomes na tela de inventário (na ordem exibida)
+EQUIPMENT_SLOTS = {"weapon": "Arma", "helmet": "Elmo", "chest": "Peitoral", "gloves": "Luvas", "boots": "Botas"}
+
+# --- Regras de combate (usadas por Player, Enemy, Battle e pelo simulador battle_sim) ---
+# Atributos iniciais de cada classe; heal_spell é (custo de mana, cura) da magia de cura inicial
+CLASS_STATS = {
+    "Guerreiro": {"max_hp": 150, "max_mana": 30, "base_attack": 15, "crit_chance": 0.20, "weapon_power": 8, "potions": 1, "heal_spell": None},
+    "Mago": {"max_hp": 80, "max_mana": 100, "base_attack": 5, "crit_chance": 0.10, "weapon_power": 4, "potions": 0, "heal_spell": (10, 25)},
+    "Arqueiro": {"max_hp": 100, "max_mana": 50, "base_attack": 10, "crit_chance": 0.35, "weapon_power": 6, "potions": 1, "heal_spell": None},
+}
+LEVEL_UP_HP = 20 # HP máximo ganho por nível (e uma Poção extra)
+LEVEL_UP_MANA = 10
+POTION_HEAL_FRACTION = 0.40 # Fração do HP máximo curada por uma Poção
+ENEMY_ATTACK_RANGES = {1: (10, 30), 2: (30, 50), 3: (50, 70), 4: (70, 90)} # Nível -> ataque (mín, máx); acima de 4 usa o último
+ENEMY_CRIT_CHANCE = 0.10
+ENEMY_HEAL_AMOUNT = 20
+ENEMY_HEAL_THRESHOLD = 0.3 # Abaixo dessa fração de HP o inimigo pode se curar (50% de chance)
+ENEMY_FLEE_THRESHOLD = 0 # Abaixo dessa fração de HP o inimigo foge do jogador no mapa; 0 desliga a fuga
+ENEMY_WEAKNESSES = {FIRE: 1.5}
+ENEMY_RESISTANCES = {ICE: 0.5}
+BOSS_MAX_HP = 800
+BOSS_ATTACK_RANGE = (50, 80)
+BOSS_RESISTANCES = {PHYSICAL: 0.7, FIRE: 0.7, ICE: 0.7}
+BOSS_ENRAGE_BONUS = 20 # Ataque extra quando o chefe entra em fúria (HP <= 50%)
+BOSS_SMASH_RANGE = (100, 150)
\ No newline at end of file
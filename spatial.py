@@ -0,0 +1,85 @@
+from settings import TILE_SIZE, SPATIAL_CELL_SIZE
+
+class SpatialHash:
+    """Índice espacial em grade: cada célula de SPATIAL_CELL_SIZE tiles guarda as entidades que a ocupam.
+
+    Entidades maiores que um tile (como o Boss 2x2, via atributo size) ocupam todas as células que
+    cobrem. Depois que uma entidade anda, update() a move de célula de forma incremental.
+    As consultas custam proporcionalmente às entidades próximas, não ao total do nível."""
+
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {} # (cx, cy) -> {entidade: None} (dict como conjunto ordenado)
+        self.bounds = {} # entidade -> (x, y, largura, altura) em tiles
+
+    @staticmethod
+    def from_entities(entities, cell_size=SPATIAL_CELL_SIZE):
+        index = SpatialHash(cell_size)
+        for entity in entities:
+            index.insert(entity)
+        return index
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def __contains__(self, entity):
+        return entity in self.bounds
+
+    def cell_keys(self, x, y, width, height):
+        size = self.cell_size
+        for cy in range(y // size, (y + height - 1) // size + 1):
+            for cx in range(x // size, (x + width - 1) // size + 1):
+                yield (cx, cy)
+
+    def insert(self, entity):
+        tiles = max(1, getattr(entity, "size", TILE_SIZE) // TILE_SIZE)
+        bounds = (entity.x, entity.y, tiles, tiles)
+        self.bounds[entity] = bounds
+        for key in self.cell_keys(*bounds):
+            self.cells.setdefault(key, {})[entity] = None
+
+    def remove(self, entity):
+        bounds = self.bounds.pop(entity, None)
+        if bounds is None:
+            return
+        for key in self.cell_keys(*bounds):
+            cell = self.cells[key]
+            del cell[entity]
+            if not cell:
+                del self.cells[key]
+
+    def update(self, entity):
+        """Atualiza a posição indexada depois que a entidade se moveu."""
+        old = self.bounds.get(entity)
+        if old is None:
+            self.insert(entity)
+            return
+        if (entity.x, entity.y) == old[:2]:
+            return
+        new = (entity.x, entity.y, old[2], old[3])
+        if list(self.cell_keys(*old)) == list(self.cell_keys(*new)):
+            self.bounds[entity] = new # Continua nas mesmas células
+            return
+        self.remove(entity)
+        self.insert(entity)
+
+    def query_rect(self, x, y, width, height):
+        """Entidades cuja área ocupada intersecta o retângulo de tiles (x, y, largura, altura)."""
+        found = {}
+        for key in self.cell_keys(x, y, width, height):
+            for entity in self.cells.get(key, ()):
+                if entity in found:
+                    continue
+                ex, ey, ew, eh = self.bounds[entity]
+                if ex < x + width and x < ex + ew and ey < y + height and y < ey + eh:
+                    found[entity] = None
+        return list(found)
+
+    def query_point(self, x, y):
+        """Entidades que ocupam o tile (x, y)."""
+        return self.query_rect(x, y, 1, 1)
+
+    def query_radius(self, x, y, radius):
+        """Entidades a até `radius` tiles de (x, y) em qualquer direção, diagonais incluídas
+        (a mesma regra de adjacência usada para interagir com NPCs e baús)."""
+        return self.query_rect(x - radius, y - radius, 2 * radius + 1, 2 * radius + 1)
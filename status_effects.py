@@ -1,3 +1,5 @@
+import heapq
+
 class StatusEffect:
     def __init__(self, name, duration, damage_per_turn=0, stat_mods=None, color=(255, 255, 255)):
         self.name = name
@@ -7,4 +9,80 @@ class StatusEffect:
         self.color = color
 
     def __str__(self):
-        return f"{self.name} ({self.duration})"
\ No newline at end of file
+        return f"{self.name} ({self.duration})"
+
+class StatusEffects:
+    """Efeitos ativos de um combatente (jogador ou inimigo), indexados pelo nome.
+
+    Os totais de stat_mods são atualizados quando um efeito entra ou sai, então ler um modificador
+    é O(1) não importa quantos efeitos estejam empilhados. O fim de cada efeito é agendado num heap
+    pelo turno em que expira; reaplicar um efeito só empurra um novo agendamento e o antigo é
+    descartado quando sair do heap."""
+
+    def __init__(self):
+        self.turn = 0
+        self.active = {} # nome -> StatusEffect (cópia própria, com expires_at)
+        self.damaging = {} # nome -> efeito com dano por turno
+        self.totals = {} # atributo -> soma dos stat_mods ativos
+        self.expiry = [] # heap de (turno em que expira, ordem, nome)
+        self.scheduled = 0
+
+    def __len__(self):
+        return len(self.active)
+
+    def __iter__(self):
+        return iter(list(self.active.values()))
+
+    def __contains__(self, name):
+        return name in self.active
+
+    def remaining(self, name):
+        """Turnos que ainda faltam para o efeito expirar."""
+        return self.active[name].expires_at - self.turn
+
+    def modifier(self, stat):
+        return self.totals.get(stat, 0)
+
+    def apply(self, effect):
+        """Aplica uma cópia do efeito; se já houver um com o mesmo nome, só renova a duração."""
+        current = self.active.get(effect.name)
+        if current is None:
+            current = StatusEffect(effect.name, effect.duration, effect.damage_per_turn, effect.stat_mods, effect.color)
+            self.active[effect.name] = current
+            if current.damage_per_turn > 0:
+                self.damaging[current.name] = current
+            for stat, value in current.stat_mods.items():
+                self.totals[stat] = self.totals.get(stat, 0) + value
+        else:
+            current.duration = effect.duration
+        current.expires_at = self.turn + effect.duration
+        self.scheduled += 1
+        heapq.heappush(self.expiry, (current.expires_at, self.scheduled, current.name))
+
+    def remove(self, name):
+        effect = self.active.pop(name)
+        self.damaging.pop(name, None)
+        for stat, value in effect.stat_mods.items():
+            self.totals[stat] -= value
+            if not self.totals[stat]:
+                del self.totals[stat]
+        return effect
+
+    def tick(self):
+        """Avança um turno. Retorna (efeitos que causam dano neste turno, efeitos que expiraram);
+        quem aplica o dano e escreve as mensagens é o dono dos efeitos."""
+        self.turn += 1
+        damaging = list(self.damaging.values())
+        expired = []
+        while self.expiry and self.expiry[0][0] <= self.turn:
+            expires_at, _, name = heapq.heappop(self.expiry)
+            effect = self.active.get(name)
+            if effect is not None and effect.expires_at == expires_at:
+                expired.append(self.remove(name))
+        return damaging, expired
+
+    def clear(self):
+        self.active.clear()
+        self.damaging.clear()
+        self.totals.clear()
+        self.expiry.clear()
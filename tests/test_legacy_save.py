@@ -0,0 +1,48 @@
+import json
+import os
+import shutil
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest
+from chest import TreasureChest
+
+
+@pytest.fixture
+def game_dir(tmp_path, monkeypatch):
+    """Diretório de trabalho com os assets e apenas o savegame.json antigo, salvando em arquivo."""
+    import main
+    shutil.copytree(os.path.join(ROOT, "assets"), tmp_path / "assets")
+    shutil.copy(os.path.join(ROOT, "savegame.json"), tmp_path / "savegame.json")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "world_store", None)
+    return tmp_path
+
+
+def chest_state(chests):
+    return sorted((c.x, c.y, c.gold, c.is_opened, tuple(item.name for item in c.items)) for c in chests)
+
+
+def test_legacy_chests_survive_save_and_load(game_dir):
+    import main
+
+    with open("savegame.json") as f:
+        legacy_chests = json.load(f)["chests"]
+
+    player, game_map, enemies, npcs, chests, level = main.load_game()
+    migrated = chest_state(chests)
+    assert migrated == chest_state(TreasureChest.from_dict(c_data) for c_data in legacy_chests)
+    assert all(game_map.is_walkable(c.x, c.y) for c in chests)
+
+    main.save_game(player, enemies, npcs, level, game_map)
+    assert main.find_save_file() == main.SAVE_FILE
+
+    player, game_map, enemies, npcs, chests, level = main.load_game()
+    assert chest_state(chests) == migrated
+    assert all(game_map.is_walkable(c.x, c.y) for c in chests)
+    assert all(game_map.occupants.get((c.x, c.y)) for c in chests)
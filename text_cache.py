@@ -0,0 +1,63 @@
+import pygame
+from collections import OrderedDict
+from settings import TEXT_CACHE_SIZE
+
+class CachedFont:
+    """Fonte compartilhada cujo render() devolve Surfaces prontas do cache de textos.
+    As Surfaces retornadas são compartilhadas: só devem ser desenhadas, nunca alteradas."""
+
+    def __init__(self, cache, name, size):
+        self.cache = cache
+        self.name = name
+        self.font_size = size
+        self.font = pygame.font.SysFont(name, size)
+
+    def render(self, text, antialias, color):
+        return self.cache.render(self, text, antialias, color)
+
+    def size(self, text):
+        return self.font.size(text)
+
+    def get_linesize(self):
+        return self.font.get_linesize()
+
+class TextCache:
+    """Cache LRU de textos renderizados, indexado por (fonte, tamanho, texto, cor, antialias)."""
+
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.fonts = {} # (nome, tamanho) -> CachedFont
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_font(self, name, size):
+        key = (name, size)
+        if key not in self.fonts:
+            self.fonts[key] = CachedFont(self, name, size)
+        return self.fonts[key]
+
+    def render(self, font, text, antialias, color):
+        key = (font.name, font.font_size, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = self.misses = 0
+
+# Instância compartilhada por todo o jogo
+text_cache = TextCache()
+
+def get_font(name, size):
+    return text_cache.get_font(name, size)
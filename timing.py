@@ -0,0 +1,36 @@
+from settings import SIM_TICK_RATE, SIM_MAX_CATCHUP_TICKS
+
+class FixedTimestep:
+    """Relógio da simulação com passo fixo, separado da taxa de renderização.
+
+    A cada frame, advance() recebe o tempo real decorrido e devolve quantos passos de
+    1 / SIM_TICK_RATE segundo devem ser simulados. Se a renderização atrasar, os passos se
+    acumulam e são recuperados no frame seguinte, então a velocidade do jogo não muda. O atraso
+    recuperado de uma vez é limitado a SIM_MAX_CATCHUP_TICKS; o excesso (ex.: depois de uma
+    tela modal) é descartado para a simulação não disparar."""
+
+    def __init__(self, tick_rate=SIM_TICK_RATE, max_catchup=SIM_MAX_CATCHUP_TICKS):
+        self.tick_rate = tick_rate
+        self.tick_ms = 1000 / tick_rate
+        self.max_catchup = max_catchup
+        self.accumulator = 0.0
+        self.ticks = 0 # Total de passos simulados
+
+    def advance(self, elapsed_ms):
+        self.accumulator += elapsed_ms
+        due = int(self.accumulator // self.tick_ms)
+        if due > self.max_catchup:
+            due = self.max_catchup
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= due * self.tick_ms
+        return due
+
+    def step(self):
+        """Marca um passo simulado; devolve o número do passo."""
+        self.ticks += 1
+        return self.ticks
+
+    def reset(self):
+        """Descarta o tempo acumulado (ex.: depois de uma tela que pausa o jogo)."""
+        self.accumulator = 0.0
@@ -0,0 +1,139 @@
+import sqlite3
+import threading
+import save_format
+from settings import MAP_CHUNK_SIZE, WORLD_STORE_FILE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS levels (level INTEGER PRIMARY KEY, seed INTEGER NOT NULL, streaming INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS tiles (level INTEGER, x INTEGER, y INTEGER, type INTEGER NOT NULL,
+                                  PRIMARY KEY (level, x, y)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS opened_chests (level INTEGER, x INTEGER, y INTEGER, PRIMARY KEY (level, x, y)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS enemies (level INTEGER, slot INTEGER, x INTEGER, y INTEGER, enemy_level INTEGER,
+                                    hp INTEGER, is_boss INTEGER, PRIMARY KEY (level, slot)) WITHOUT ROWID;
+"""
+
+class WorldStore:
+    """Mundo persistente de vários níveis num banco SQLite local (modo WAL).
+
+    Cada nível é guardado como no delta do LevelCache: a semente, os tiles alterados, os baús abertos
+    e os inimigos. O jogador, os NPCs e o nível atual ficam na tabela state. O store lembra o que já
+    está gravado e, a cada gravação, escreve numa única transação só as linhas que mudaram; níveis são
+    lidos do banco apenas quando o jogador volta a eles.
+
+    Pode ser usado pela thread do SaveWriter e pela thread principal ao mesmo tempo."""
+
+    def __init__(self, path=WORLD_STORE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL") # Com WAL, uma queda perde no máximo a última transação
+        self.conn.executescript(SCHEMA)
+        # O que está no banco, por nível: {"level": (seed, streaming), "tiles": {...}, "opened": set, "enemies": [...]}
+        self.written = {}
+        self.written_state = {}
+
+    def has_game(self):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM state WHERE key = 'player'").fetchone() is not None
+
+    def clear(self):
+        with self.lock, self.conn:
+            for table in ("state", "levels", "tiles", "opened_chests", "enemies"):
+                self.conn.execute(f"DELETE FROM {table}")
+            self.written.clear()
+            self.written_state.clear()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # --- Gravação ---
+    def write_snapshot(self, save_data):
+        """Grava um retrato de snapshot_game (com "levels") numa única transação."""
+        with self.lock:
+            try:
+                with self.conn:
+                    self.write_state_and_levels(save_data)
+            except sqlite3.Error:
+                # A transação foi desfeita: o que o store acha que está gravado não vale mais
+                self.written.clear()
+                self.written_state.clear()
+                raise
+
+    def write_state_and_levels(self, save_data):
+        state = {"player": save_data["player"], "npcs": save_data["npcs"], "current_level": save_data["current_level"]}
+        for key, value in state.items():
+            blob = save_format.encode(value)
+            if self.written_state.get(key) != blob:
+                self.conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, blob))
+                self.written_state[key] = blob
+        for level, delta in save_data["levels"].items():
+            self.write_level(level, delta)
+
+    def write_level(self, level, delta):
+        map_data = delta["map"]
+        tiles, opened = {}, set()
+        for chunk in map_data["chunk_deltas"]:
+            tiles.update(((x, y), t) for x, y, t in chunk["tiles"])
+            opened.update(tuple(pos) for pos in chunk["opened_chests"])
+        enemies = [(e["x"], e["y"], e["level"], e["hp"], int(e["is_boss"])) for e in delta["enemies"]]
+        header = (map_data["seed"], int(map_data["streaming"]))
+
+        old = self.written.get(level) or {"level": None, "tiles": {}, "opened": set(), "enemies": []}
+        execute, executemany = self.conn.execute, self.conn.executemany
+        if old["level"] != header:
+            execute("INSERT OR REPLACE INTO levels (level, seed, streaming) VALUES (?, ?, ?)", (level,) + header)
+
+        changed = [(level, x, y, t) for (x, y), t in tiles.items() if old["tiles"].get((x, y)) != t]
+        executemany("INSERT OR REPLACE INTO tiles (level, x, y, type) VALUES (?, ?, ?, ?)", changed)
+        removed = [(level, x, y) for (x, y) in old["tiles"].keys() - tiles.keys()]
+        executemany("DELETE FROM tiles WHERE level = ? AND x = ? AND y = ?", removed)
+
+        executemany("INSERT OR IGNORE INTO opened_chests (level, x, y) VALUES (?, ?, ?)",
+                    [(level, x, y) for x, y in opened - old["opened"]])
+        executemany("DELETE FROM opened_chests WHERE level = ? AND x = ? AND y = ?",
+                    [(level, x, y) for x, y in old["opened"] - opened])
+
+        old_enemies = old["enemies"]
+        executemany("INSERT OR REPLACE INTO enemies (level, slot, x, y, enemy_level, hp, is_boss) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(level, slot) + row for slot, row in enumerate(enemies)
+                     if slot >= len(old_enemies) or old_enemies[slot] != row])
+        if len(enemies) < len(old_enemies):
+            execute("DELETE FROM enemies WHERE level = ? AND slot >= ?", (level, len(enemies)))
+
+        self.written[level] = {"level": header, "tiles": tiles, "opened": opened, "enemies": enemies}
+
+    # --- Leitura ---
+    def load_state(self):
+        """(player, npcs, current_level) do último retrato gravado."""
+        with self.lock:
+            rows = dict(self.conn.execute("SELECT key, value FROM state"))
+            self.written_state = dict(rows)
+        npcs = save_format.decode(rows["npcs"]) if "npcs" in rows else []
+        return save_format.decode(rows["player"]), npcs, save_format.decode(rows["current_level"])
+
+    def load_level(self, level):
+        """Delta do nível no formato do LevelCache ({"map": ..., "enemies": [...]}), ou None se nunca foi gravado."""
+        with self.lock:
+            header = self.conn.execute("SELECT seed, streaming FROM levels WHERE level = ?", (level,)).fetchone()
+            if header is None:
+                return None
+            tiles = {(x, y): t for x, y, t in self.conn.execute("SELECT x, y, type FROM tiles WHERE level = ?", (level,))}
+            opened = set(self.conn.execute("SELECT x, y FROM opened_chests WHERE level = ?", (level,)))
+            enemies = [row for row in self.conn.execute(
+                "SELECT x, y, enemy_level, hp, is_boss FROM enemies WHERE level = ? ORDER BY slot", (level,))]
+            self.written[level] = {"level": tuple(header), "tiles": tiles, "opened": opened, "enemies": enemies}
+
+        chunks = {}
+        for (x, y), t in tiles.items():
+            chunks.setdefault((x // MAP_CHUNK_SIZE, y // MAP_CHUNK_SIZE), {"tiles": [], "opened_chests": []})["tiles"].append([x, y, t])
+        for x, y in opened:
+            chunks.setdefault((x // MAP_CHUNK_SIZE, y // MAP_CHUNK_SIZE), {"tiles": [], "opened_chests": []})["opened_chests"].append([x, y])
+        return {
+            "map": {"seed": header[0], "streaming": bool(header[1]),
+                    "chunk_deltas": [dict(cx=cx, cy=cy, **chunk) for (cx, cy), chunk in chunks.items()]},
+            "enemies": [{"x": x, "y": y, "level": enemy_level, "hp": hp, "is_boss": bool(is_boss)}
+                        for x, y, enemy_level, hp, is_boss in enemies],
+        }